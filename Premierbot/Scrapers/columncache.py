@@ -0,0 +1,96 @@
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from statnormalizer import normalize_frame
+
+# ------------------------
+# Binary columnar sidecar for matches_*.csv
+# ------------------------
+# matches_ALL.csv gets a sibling directory .matches_ALL.cols/ holding one .npy
+# file per column:
+#   raw/<n>.npy    the CSV's original strings (fixed-width unicode)
+#   typed/<n>.npy  float64 columns from statnormalizer.normalize_frame (the
+#                  string id columns, period included, stay raw-only)
+#   meta.json      source size/mtime plus the column -> file mapping
+# It is rebuilt only when the CSV's size or mtime changes. Columns are
+# memory-mapped, so a query only pages in the columns it actually touches.
+
+CACHE_VERSION = 1
+
+
+def sidecar_dir(csv_path: str) -> str:
+    folder, name = os.path.split(csv_path)
+    return os.path.join(folder, f".{os.path.splitext(name)[0]}.cols")
+
+
+def _signature(csv_path: str) -> dict:
+    stat = os.stat(csv_path)
+    return {"version": CACHE_VERSION, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _read_meta(cache_dir: str):
+    try:
+        with open(os.path.join(cache_dir, "meta.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_columns(folder: str, frame: pd.DataFrame) -> dict:
+    """Save each column as <n>.npy (column names may not be valid file names)."""
+    os.makedirs(folder)
+    files = {}
+    for n, column in enumerate(frame.columns):
+        values = frame[column].to_numpy()
+        if values.dtype == object:
+            values = values.astype(str)
+        np.save(os.path.join(folder, f"{n}.npy"), values)
+        files[column] = f"{n}.npy"
+    return files
+
+
+def build_sidecar(csv_path: str) -> dict:
+    """Parse csv_path once and write its raw and typed column files."""
+    signature = _signature(csv_path)
+    raw = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    typed = normalize_frame(raw.replace("", pd.NA))
+    typed = typed.drop(columns=[c for c in ("period", "match_id", "season", "team", "opponent") if c in typed])
+
+    cache_dir = sidecar_dir(csv_path)
+    tmp_dir = f"{cache_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    meta = {
+        "signature": signature,
+        "rows": len(raw),
+        "raw": _save_columns(os.path.join(tmp_dir, "raw"), raw),
+        "typed": _save_columns(os.path.join(tmp_dir, "typed"), typed.astype(float)),
+    }
+    with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.replace(tmp_dir, cache_dir)
+    return meta
+
+
+def ensure_sidecar(csv_path: str) -> dict:
+    """Return the sidecar metadata, rebuilding it if the CSV changed."""
+    meta = _read_meta(sidecar_dir(csv_path))
+    if meta is None or meta["signature"] != _signature(csv_path):
+        meta = build_sidecar(csv_path)
+    return meta
+
+
+def load_columns(csv_path: str, columns: list[str] = None, kind: str = "raw", mmap: bool = True) -> dict:
+    """
+    {column: array} for the requested columns (all of them if columns is None).
+    kind="raw" gives the original strings, kind="typed" the float columns.
+    Unknown column names raise KeyError.
+    """
+    meta = ensure_sidecar(csv_path)
+    files = meta[kind]
+    folder = os.path.join(sidecar_dir(csv_path), kind)
+    mmap_mode = "r" if mmap else None
+    return {column: np.load(os.path.join(folder, files[column]), mmap_mode=mmap_mode)
+            for column in (files if columns is None else columns)}
@@ -0,0 +1,81 @@
+import csv
+import json
+import os
+from statschema import CSV_FIELDS
+
+# ------------------------
+# Streaming CSV output with a fixed header
+# ------------------------
+class StreamingCSVWriter:
+    """
+    Write rows to a CSV as they are produced, using a declared header so no
+    second pass over the data is needed. Each write is flushed, so a crash
+    leaves every match written so far on disk.
+
+    Keys outside the header are not dropped silently: they are appended to
+    '<name>_extras.jsonl' as {"match_id", "team", "stats": {...}} lines.
+
+    With append=True new rows go after the existing ones. A file written
+    with a different header is migrated to the declared one first.
+    """
+
+    def __init__(self, filename: str, fieldnames: list[str] = CSV_FIELDS, append: bool = False):
+        self.filename = filename
+        self.fieldnames = fieldnames
+        self.fieldset = set(fieldnames)
+        self.extras_filename = f"{os.path.splitext(filename)[0]}_extras.jsonl"
+        self.rows_written = 0
+        self.extras = None
+
+        if append and os.path.exists(filename):
+            with open(filename, "r", newline="", encoding="utf-8") as f:
+                header = next(csv.reader(f), None)
+            if header != fieldnames:
+                self._migrate()
+            self.file = open(filename, "a", newline="", encoding="utf-8")
+            self.writer = csv.DictWriter(self.file, fieldnames=fieldnames, extrasaction="ignore")
+        else:
+            self.file = open(filename, "w", newline="", encoding="utf-8")
+            self.writer = csv.DictWriter(self.file, fieldnames=fieldnames, extrasaction="ignore")
+            self.writer.writeheader()
+            if os.path.exists(self.extras_filename):
+                os.remove(self.extras_filename)
+
+    def _migrate(self):
+        """Rewrite an existing file under the declared header (one-off, not per run)."""
+        with open(self.filename, "r", newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        tmp_path = f"{self.filename}.tmp"
+        self.file = open(tmp_path, "w", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.file, fieldnames=self.fieldnames, extrasaction="ignore")
+        self.writer.writeheader()
+        self.write_rows(rows)
+        self.rows_written = 0
+        self.file.close()
+        os.replace(tmp_path, self.filename)
+        print(f"Migrated '{self.filename}' to the declared stat schema.")
+
+    def write_rows(self, rows: list[dict]):
+        for row in rows:
+            extras = {k: v for k, v in row.items() if k not in self.fieldset}
+            if extras:
+                if self.extras is None:
+                    self.extras = open(self.extras_filename, "a", encoding="utf-8")
+                self.extras.write(json.dumps({"match_id": row.get("match_id"), "team": row.get("team"),
+                                              "stats": extras}) + "\n")
+        self.writer.writerows(rows)
+        self.rows_written += len(rows)
+        self.file.flush()
+        if self.extras is not None:
+            self.extras.flush()
+
+    def close(self):
+        self.file.close()
+        if self.extras is not None:
+            self.extras.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,185 @@
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ------------------------
+# Local stand-in for the SofaScore statistics API
+# ------------------------
+# Serves /api/v1/event/{id}/statistics with a payload shaped like the real one
+# (ALL / 1ST / 2ND periods -> groups -> statisticsItems) and /api/v1/event/{id}
+# reporting every match as finished, so the fetch engine in poopfart.py can be
+# exercised and timed without touching the network.
+
+STAT_GROUPS = {
+    "Match overview": [
+        ("ballPossession", "Ball possession", "pct"),
+        ("expectedGoals", "Expected goals", "xg"),
+        ("bigChanceCreated", "Big chances", "int"),
+        ("totalShotsOnGoal", "Total shots", "int"),
+        ("goalkeeperSaves", "Goalkeeper saves", "int"),
+        ("cornerKicks", "Corner kicks", "int"),
+        ("fouls", "Fouls", "int"),
+        ("passes", "Passes", "int"),
+        ("totalTackle", "Tackles", "int"),
+        ("freeKicks", "Free kicks", "int"),
+        ("yellowCards", "Yellow cards", "int"),
+        ("redCards", "Red cards", "int"),
+    ],
+    "Shots": [
+        ("shotsOnGoal", "Shots on target", "int"),
+        ("hitWoodwork", "Hit woodwork", "int"),
+        ("shotsOffGoal", "Shots off target", "int"),
+        ("blockedScoringAttempt", "Blocked shots", "int"),
+        ("totalShotsInsideBox", "Shots inside box", "int"),
+        ("totalShotsOutsideBox", "Shots outside box", "int"),
+    ],
+    "Attack": [
+        ("bigChanceScored", "Big chances scored", "int"),
+        ("bigChanceMissed", "Big chances missed", "int"),
+        ("accurateThroughBalls", "Through balls", "int"),
+        ("touchesInOppBox", "Touches in penalty area", "int"),
+        ("fouledFinalThird", "Fouled in final third", "int"),
+        ("offsides", "Offsides", "int"),
+    ],
+    "Passes": [
+        ("accuratePasses", "Accurate passes", "int"),
+        ("throwIns", "Throw-ins", "int"),
+        ("finalThirdEntries", "Final third entries", "int"),
+        ("finalThirdPhaseStatistic", "Final third phase", "ratio"),
+        ("accurateLongBalls", "Long balls", "ratio"),
+        ("accurateCross", "Crosses", "ratio"),
+    ],
+    "Duels": [
+        ("duelWonPercent", "Duels", "pct"),
+        ("dispossessed", "Dispossessed", "int"),
+        ("groundDuelsPercentage", "Ground duels", "ratio"),
+        ("aerialDuelsPercentage", "Aerial duels", "ratio"),
+        ("dribblesPercentage", "Dribbles", "ratio"),
+    ],
+    "Defending": [
+        ("wonTacklePercent", "Tackles won", "pct"),
+        ("totalTackle", "Total tackles", "int"),
+        ("interceptionWon", "Interceptions", "int"),
+        ("ballRecovery", "Recoveries", "int"),
+        ("totalClearance", "Clearances", "int"),
+        ("errorsLeadToShot", "Errors lead to a shot", "int"),
+        ("errorsLeadToGoal", "Errors lead to a goal", "int"),
+    ],
+    "Goalkeeping": [
+        ("goalkeeperSaves", "Total saves", "int"),
+        ("goalsPrevented", "Goals prevented", "xg"),
+        ("bigSaves", "Big saves", "int"),
+        ("highClaims", "High claims", "int"),
+        ("punches", "Punches", "int"),
+        ("goalKicks", "Goal kicks", "int"),
+        ("penaltySave", "Penalty saves", "int"),
+    ],
+}
+
+SEASON_START = 1723834800  # 2024-08-16 19:00 UTC
+EVENT_PATH = re.compile(r"^/api/v1/event/(\d+)(/statistics)?/?$")
+
+
+def _fake_value(kind: str, rng: random.Random) -> str:
+    if kind == "pct":
+        return f"{rng.randint(25, 75)}%"
+    if kind == "xg":
+        return f"{rng.uniform(0, 3):.2f}"
+    if kind == "ratio":
+        attempted = rng.randint(5, 150)
+        made = rng.randint(0, attempted)
+        return f"{made}/{attempted} ({round(100 * made / attempted)}%)"
+    return str(rng.randint(0, 25))
+
+
+def build_fake_statistics(match_id: int) -> dict:
+    """Build a deterministic statistics payload for match_id."""
+    rng = random.Random(int(match_id))
+    periods = []
+    for period in ["ALL", "1ST", "2ND"]:
+        groups = []
+        values = {}  # SofaScore repeats some keys under two names with the same value
+        for group_name, items in STAT_GROUPS.items():
+            stats = []
+            for key, name, kind in items:
+                if key not in values:
+                    values[key] = (_fake_value(kind, rng), _fake_value(kind, rng))
+                stats.append({
+                    "name": name,
+                    "home": values[key][0],
+                    "away": values[key][1],
+                    "key": key,
+                    "statisticsType": "positive",
+                })
+            groups.append({"groupName": group_name, "statisticsItems": stats})
+        periods.append({"period": period, "groups": groups})
+    return {"statistics": periods}
+
+
+def fake_start_timestamp(match_id: int) -> int:
+    """A deterministic kick-off between mid-August and May of the 2024-2025 season."""
+    return SEASON_START + (int(match_id) % 270) * 86400
+
+
+class FakeSofaScoreHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+
+    def do_GET(self):
+        match = EVENT_PATH.match(self.path)
+        if not match:
+            self.send_error(404)
+            return
+        if self.latency:
+            time.sleep(self.latency)
+        match_id = int(match.group(1))
+        if match.group(2):
+            payload = build_fake_statistics(match_id)
+        else:
+            payload = {"event": {"id": match_id, "status": {"code": 100, "type": "finished"},
+                                 "startTimestamp": fake_start_timestamp(match_id)}}
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port: int = 0, latency: float = 0.0):
+    """
+    Start the stand-in server on a background thread.
+    Returns (server, base_url); base_url can be passed straight to
+    poopfart.fetch_all_statistics. Call server.shutdown() when done.
+    """
+    handler = type("Handler", (FakeSofaScoreHandler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/api/v1"
+
+
+def benchmark(n_matches: int = 280, latency: float = 0.25, workers=(1, 4, 8, 16)):
+    """Time a backfill of n_matches against the stand-in server for each worker count."""
+    from poopfart import fetch_all_statistics
+
+    server, base_url = start_server(latency=latency)
+    match_ids = list(range(12436870, 12436870 + n_matches))
+    try:
+        for max_workers in workers:
+            start = time.perf_counter()
+            fetched = sum(1 for _, data, *_ in fetch_all_statistics(match_ids, max_workers, base_url) if data)
+            elapsed = time.perf_counter() - start
+            print(f"{max_workers:>3} workers: {fetched} matches in {elapsed:.2f}s "
+                  f"({fetched / elapsed:.1f} matches/s)")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    benchmark()
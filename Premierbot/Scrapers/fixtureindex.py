@@ -0,0 +1,118 @@
+import glob
+import html
+import os
+import pickle
+import re
+from collections import namedtuple
+
+# ------------------------
+# Fixture index built from the SofaScore round snapshots
+# ------------------------
+# htmlscripts/Dataids/roundN.txt are saved SofaScore round pages. Each
+# event_cell anchor carries the match id, the two team names and the status.
+# A regex pass over the raw text replaces BeautifulSoup's html.parser, and the
+# result is pickled next to the snapshots, keyed by every file's size and
+# mtime, so later imports just unpickle it.
+
+ROUNDS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "htmlscripts", "Dataids")
+INDEX_FILE = ".fixtureindex.pickle"
+INDEX_VERSION = 1
+
+Fixture = namedtuple("Fixture", ["match_id", "round", "home", "away", "status"])
+
+EVENT_CELL = re.compile(r'<a\b[^>]*\bdata-testid="event_cell"[^>]*>')
+DATA_ID = re.compile(r'\bdata-id="(\d+)"')
+STATUS = re.compile(r'<div title="([^"]*)"')
+TAG = re.compile(r"<[^>]+>")
+LEFT_TEAM = 'data-testid="left_team"'
+RIGHT_TEAM = 'data-testid="right_team"'
+
+
+def _text(fragment: str) -> str:
+    return html.unescape(TAG.sub("", fragment)).strip()
+
+
+def _team_text(cell: str, marker: str, end_marker: str) -> str:
+    """Text of the element opened at marker, up to the tag holding end_marker."""
+    start = cell.find(marker)
+    if start == -1:
+        return ""
+    start = cell.find(">", start) + 1
+    end = cell.find(end_marker, start)
+    end = len(cell) if end == -1 else cell.rfind("<", start, end)
+    return _text(cell[start:end])
+
+
+def parse_round_file(path: str, round_number: int) -> list[Fixture]:
+    """Extract every event_cell in a round snapshot, in page order."""
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    starts = list(EVENT_CELL.finditer(content))
+    fixtures = []
+    for i, match in enumerate(starts):
+        match_id = DATA_ID.search(match.group(0))
+        if not match_id:
+            continue
+        end = starts[i + 1].start() if i + 1 < len(starts) else len(content)
+        cell = content[match.end():end]
+        status = STATUS.search(cell)
+        fixtures.append(Fixture(
+            match_id=match_id.group(1),
+            round=round_number,
+            home=_team_text(cell, LEFT_TEAM, RIGHT_TEAM),
+            away=_team_text(cell, RIGHT_TEAM, "data-testid="),
+            status=status.group(1) if status else "",
+        ))
+    return fixtures
+
+
+def round_files(rounds_dir: str = ROUNDS_DIR) -> list[tuple[int, str]]:
+    """(round number, path) for every roundN.txt, in round order."""
+    files = []
+    for path in glob.glob(os.path.join(rounds_dir, "round*.txt")):
+        number = re.search(r"round(\d+)\.txt$", path)
+        if number:
+            files.append((int(number.group(1)), path))
+    return sorted(files)
+
+
+def _signature(files: list[tuple[int, str]]) -> list:
+    signature = [INDEX_VERSION]
+    for round_number, path in files:
+        stat = os.stat(path)
+        signature.append((round_number, os.path.basename(path), stat.st_size, stat.st_mtime_ns))
+    return signature
+
+
+def load_fixtures(rounds_dir: str = ROUNDS_DIR) -> list[Fixture]:
+    """
+    All fixtures from every round file, in round then page order. Served from
+    the pickled index when no round file has changed since it was built.
+    """
+    files = round_files(rounds_dir)
+    signature = _signature(files)
+    index_path = os.path.join(rounds_dir, INDEX_FILE)
+    try:
+        with open(index_path, "rb") as f:
+            cached = pickle.load(f)
+        if cached["signature"] == signature:
+            return cached["fixtures"]
+    except (OSError, pickle.UnpicklingError, EOFError, KeyError, TypeError):
+        pass
+
+    fixtures = []
+    for round_number, path in files:
+        fixtures.extend(parse_round_file(path, round_number))
+    try:
+        with open(f"{index_path}.tmp", "wb") as f:
+            pickle.dump({"signature": signature, "fixtures": fixtures}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f"{index_path}.tmp", index_path)
+    except OSError:
+        pass  # read-only checkout: still usable, just not cached
+    return fixtures
+
+
+def fixture_index(rounds_dir: str = ROUNDS_DIR) -> dict[str, Fixture]:
+    """match_id -> Fixture (a later round wins if a match id is listed twice)."""
+    return {fixture.match_id: fixture for fixture in load_fixtures(rounds_dir)}
@@ -0,0 +1,104 @@
+import numpy as np
+
+# ------------------------
+# Rolling and exponentially decayed form
+# ------------------------
+# Each team's matches are appended in chronological order. For every team
+# FormTracker keeps:
+#   - prefix sums of every column, so the mean over any last-N window is one
+#     subtraction: (prefix[k] - prefix[k - n]) / n
+#   - a running decayed sum and weight per half-life, so the decayed mean is
+#     num / den
+# Both are updated in O(1) per appended match. Nothing is recomputed from the
+# full history. Decay is per match played, since the match CSVs carry no dates.
+# Any other half-life is computed on demand from the prefix sums (every
+# match's values are prefix[k] - prefix[k - 1]) in O(matches) without touching
+# the tracker, so concurrent queries never change its state.
+
+DEFAULT_HALF_LIVES = (3.0, 5.0, 10.0)
+
+
+class TeamForm:
+    """Running state for one team (see module comment)."""
+
+    def __init__(self, n_columns: int, decays: np.ndarray):
+        self.count = 0
+        self.prefix = np.zeros((8, n_columns))  # row k = sum of the first k matches
+        self.decays = decays
+        self.num = np.zeros((len(decays), n_columns))
+        self.den = np.zeros(len(decays))
+
+    def append(self, values: np.ndarray):
+        if self.count + 1 >= len(self.prefix):
+            grown = np.zeros((2 * len(self.prefix), self.prefix.shape[1]))
+            grown[:len(self.prefix)] = self.prefix
+            self.prefix = grown
+        self.prefix[self.count + 1] = self.prefix[self.count] + values
+        self.count += 1
+        self.num *= self.decays[:, None]
+        self.num += values
+        self.den *= self.decays
+        self.den += 1.0
+
+    def decayed_sums(self, decay: float) -> tuple:
+        """(num, den) for a decay that is not tracked, rebuilt from the history."""
+        count = self.count
+        values = np.diff(self.prefix[:count + 1], axis=0)
+        weights = decay ** np.arange(count - 1, -1, -1)
+        return weights @ values, weights.sum()
+
+    def rolling_mean(self, n: int) -> np.ndarray:
+        n = min(n, self.count)
+        if n <= 0:
+            return np.zeros(self.prefix.shape[1])
+        return (self.prefix[self.count] - self.prefix[self.count - n]) / n
+
+
+class FormTracker:
+    """
+    Last-N and decayed means of `columns` for every team.
+    half_lives are in matches: a match half_life games ago weighs half as much
+    as the latest one.
+    """
+
+    def __init__(self, columns: list[str], half_lives: tuple = DEFAULT_HALF_LIVES):
+        self.columns = list(columns)
+        self.half_lives = tuple(float(h) for h in half_lives)
+        self.decays = np.array([0.5 ** (1.0 / h) for h in self.half_lives])
+        self.teams = {}
+
+    def append(self, team: str, values):
+        """Add one match (a row of column values) as the team's latest game."""
+        form = self.teams.get(team)
+        if form is None:
+            form = self.teams[team] = TeamForm(len(self.columns), self.decays)
+        form.append(np.asarray(values, dtype=np.float64))
+
+    def matches(self, team: str) -> int:
+        form = self.teams.get(team)
+        return form.count if form else 0
+
+    def rolling_mean(self, team: str, n: int) -> dict:
+        """Mean of each column over the team's last n matches (fewer if it has not played n)."""
+        form = self.teams.get(team)
+        means = form.rolling_mean(n) if form else np.zeros(len(self.columns))
+        return dict(zip(self.columns, means.tolist()))
+
+    def rolling_means(self, team: str, windows: list[int]) -> dict:
+        """{n: rolling_mean(team, n)} for several window sizes."""
+        return {n: self.rolling_mean(team, n) for n in windows}
+
+    def decayed_mean(self, team: str, half_life: float) -> dict:
+        """Exponentially decayed mean of each column (any positive half_life, in matches)."""
+        half_life = float(half_life)
+        if not half_life > 0:
+            raise ValueError(f"half_life must be a positive number of matches, got {half_life}")
+        form = self.teams.get(team)
+        if form is None or form.count == 0:
+            return dict.fromkeys(self.columns, 0.0)
+        if half_life in self.half_lives:
+            h = self.half_lives.index(half_life)
+            num, den = form.num[h], form.den[h]
+        else:
+            num, den = form.decayed_sums(0.5 ** (1.0 / half_life))
+        return dict(zip(self.columns, (num / den).tolist()))
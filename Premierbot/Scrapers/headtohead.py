@@ -1,46 +1,16 @@
-import csv
+import os
 from collections import defaultdict
-from openpyxl import Workbook
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+import numpy as np
+from columncache import load_columns
+from formmetrics import FormTracker
+from statschema import STAT_FIELDS, PERIODS
+from teamregistry import normalize_team_name, team_id
 
 # ------------------------
 # Normalization & Parsing
 # ------------------------
-team_name_mapping = {
-    'manchester utd': 'man-utd',
-    'manchester united': 'man-utd',
-    'fulham': 'fulham',
-    'ipswich town': 'ipswich',
-    'liverpool': 'liverpool',
-    'newcastle utd': 'newcastle',
-    'newcastle united': 'newcastle',
-    "nott'ham forest": 'forest',
-    'nottingham forest': 'forest',
-    'southampton': 'southampton',
-    'west ham': 'west-ham',
-    'west ham united': 'west-ham',
-    'aston villa': 'aston-villa',
-    'crystal palace': 'crystal-palace',
-    'brentford': 'brentford',
-    'manchester city': 'man-city',
-    'leicester city': 'leicester',
-    'chelsea': 'chelsea',
-    'everton': 'everton',
-    'tottenham': 'tottenham',
-    'tottenham hotspur': 'tottenham',
-    'wolves': 'wolves',
-    'wolverhampton wanderers': 'wolves',
-    'arsenal': 'arsenal',
-    'brighton': 'brighton',
-    'brighton & hove albion': 'brighton',
-    'bournemouth': 'bournemouth',
-    'afc bournemouth': 'bournemouth'
-}
-mapping = {k.lower(): v for k, v in team_name_mapping.items()}
-
-def normalize_team_name(raw_name: str) -> str:
-    lower_name = raw_name.strip().lower()
-    return mapping.get(lower_name, lower_name.replace(" ", "-"))
-
 def parse_result(result: str) -> tuple[int, int]:
     """Parse a result string like '2–1' into (home_goals, away_goals)."""
     if "–" not in result or "N/A" in result:
@@ -60,19 +30,67 @@ def parse_stat(stat: str) -> float:
         return 0.0
 
 def load_matches(csv_path: str) -> list[dict]:
-    """Load matches from a CSV into a list of dictionaries."""
+    """
+    Load matches from a CSV into a list of dictionaries.
+    Reads the binary column cache (rebuilt only when the CSV changes)
+    instead of re-parsing the CSV on every run. Every column is needed for
+    the row dicts, so they are read whole rather than memory-mapped.
+    """
+    columns = load_columns(csv_path, mmap=False)
+    names = list(columns)
+    teams = {name: normalize_team_name(name)
+             for name in set(columns['team'].tolist()) | set(columns['opponent'].tolist())}
     matches = []
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            row['team'] = normalize_team_name(row['team'])
-            row['opponent'] = normalize_team_name(row['opponent'])
-            matches.append(row)
+    for values in zip(*(column.tolist() for column in columns.values())):
+        row = dict(zip(names, values))
+        row['team'] = teams[row['team']]
+        row['opponent'] = teams[row['opponent']]
+        matches.append(row)
     return matches
 
 # ------------------------
 # Grouping Matches (each match is 2 rows)
 # ------------------------
+PERIOD_LABELS = dict(zip(PERIODS, ['Full Match', 'First Half', 'Second Half']))
+
+def load_period_datasets(long_csv: str) -> dict[str, list[dict]]:
+    """
+    Load a long-format matches_LONG.csv in one pass and split it by period,
+    keyed like main()'s datasets. The period column is dropped from the rows
+    so they match the ones load_matches gives for the per-period files.
+    """
+    datasets = {label: [] for label in PERIOD_LABELS.values()}
+    for row in load_matches(long_csv):
+        datasets[PERIOD_LABELS[row.pop('period')]].append(row)
+    return datasets
+
+def period_swing(long_csv: str, stat: str = 'Expected goals',
+                 from_period: str = '1ST', to_period: str = '2ND') -> dict[tuple[str, str], float]:
+    """
+    (match_id, team) -> change in a typed stat column between two periods,
+    e.g. the second-half xG swing, read straight from the long table.
+    Matches missing either period are left out.
+    """
+    raw = load_columns(long_csv, ['period', 'match_id', 'team'])
+    values = load_columns(long_csv, [stat], kind='typed')[stat]
+    by_period = {from_period: {}, to_period: {}}
+    for period, match_id, team, value in zip(raw['period'].tolist(), raw['match_id'].tolist(),
+                                             raw['team'].tolist(), values.tolist()):
+        if period in by_period:
+            by_period[period][(match_id, normalize_team_name(team))] = value
+    before, after = by_period[from_period], by_period[to_period]
+    return {key: after[key] - before[key] for key in after if key in before}
+
+def load_datasets(full_csv: str, first_half_csv: str, second_half_csv: str, long_csv: str = None) -> dict:
+    """All three period datasets, read once from long_csv if it exists, else from the per-period files."""
+    if long_csv and os.path.exists(long_csv):
+        return load_period_datasets(long_csv)
+    return {
+        'Full Match': load_matches(full_csv),
+        'First Half': load_matches(first_half_csv),
+        'Second Half': load_matches(second_half_csv)
+    }
+
 def deduplicate_matches(rows: list[dict]) -> dict[str, dict]:
     """
     Group rows by match_id.
@@ -93,6 +111,153 @@ def deduplicate_matches(rows: list[dict]) -> dict[str, dict]:
             dedup[match_id] = {'home': group[0], 'away': None}
     return dedup
 
+# ------------------------
+# Team-indexed store over grouped matches
+# ------------------------
+def match_recency(group: dict) -> int:
+    """Sort key: later SofaScore match ids are more recent games."""
+    return -int(group['home']['match_id'])
+
+def invert_result(row: dict) -> dict:
+    """Copy of an away row with RESULT flipped to that team's perspective."""
+    row = row.copy()
+    home_goals, away_goals = parse_result(row['RESULT'])
+    row['RESULT'] = f"{away_goals}–{home_goals}"
+    return row
+
+class MatchStore:
+    """
+    Indexes built once per dataset so lookups never rescan every match.
+    All of them are keyed by registry team ID (teamregistry.team_id):
+      - by_team[id]: groups the team played in, most recent first
+      - by_pair[frozenset((id1, id2))]: head-to-head groups, most recent first
+      - home_rows[id] / away_rows[id]: rows used for averages
+        (away rows carry the result inverted to the team's perspective)
+    The stat matrix and form tracker are built on first use.
+    """
+
+    def __init__(self, dedup_matches: dict):
+        self.dedup_matches = dedup_matches
+        self.by_team = defaultdict(list)
+        self.by_pair = defaultdict(list)
+        self.home_rows = defaultdict(list)
+        self.away_rows = defaultdict(list)
+        self._matrix = None
+        self._form = None
+        for group in sorted(dedup_matches.values(), key=match_recency):
+            self._index(group)
+
+    def _index(self, group: dict):
+        home_team = team_id(group['home']['team'], create=True)
+        away_team = team_id(group['away']['team'], create=True) if group['away'] else None
+        targets = [self.by_team[home_team], self.by_pair[frozenset((home_team, away_team))]]
+        if away_team is not None and away_team != home_team:
+            targets.append(self.by_team[away_team])
+        for groups in targets:
+            groups.append(group)
+        self.home_rows[home_team].append(group['home'])
+        if group['away'] is not None:
+            self.away_rows[away_team].append(invert_result(group['away']))
+
+    @property
+    def matrix(self) -> "StatMatrix":
+        """Typed stat matrix for this dataset, parsed on first use."""
+        if self._matrix is None:
+            self._matrix = StatMatrix(self)
+        return self._matrix
+
+    @property
+    def form(self) -> FormTracker:
+        """Rolling / decayed form of every team, replayed in match order on first use."""
+        if self._form is None:
+            self._form = FormTracker(AVERAGE_COLUMNS)
+            for group in sorted(self.dedup_matches.values(), key=match_recency, reverse=True):
+                self._append_form(group)
+        return self._form
+
+    def _append_form(self, group: dict):
+        self._form.append(team_id(group['home']['team']), row_values(group['home']))
+        if group['away'] is not None:
+            self._form.append(team_id(group['away']['team']), row_values(invert_result(group['away'])))
+
+    def last_head_to_head(self, team1: int, team2: int) -> dict:
+        groups = self.by_pair.get(frozenset((team1, team2)))
+        return groups[0] if groups else {}
+
+    def last_n(self, team: int, n: int) -> list:
+        return self.by_team.get(team, [])[:n]
+
+# ------------------------
+# Typed stat matrix with vectorized averages
+# ------------------------
+AVERAGE_COLUMNS = ['Goals scored', 'Goals conceded'] + STAT_FIELDS
+HOME, AWAY = 0, 1
+WIN, DRAW, LOSS = 0, 1, 2
+
+def row_values(row: dict) -> list[float]:
+    """A row as floats in AVERAGE_COLUMNS order, from its team's perspective."""
+    scored, conceded = parse_result(row['RESULT'])
+    return [scored, conceded] + [parse_stat(row.get(field, '')) for field in STAT_FIELDS]
+
+class StatMatrix:
+    """
+    Every row of a dataset parsed once, from its team's perspective:
+      - values[i, j]: AVERAGE_COLUMNS[j] as a float
+      - team_idx[i]: index into teams (registry team IDs)
+      - venue[i]: HOME or AWAY
+      - result[i]: WIN, DRAW or LOSS
+    Home/away averages for all teams come from one grouped reduction.
+    """
+
+    def __init__(self, store: MatchStore):
+        self.teams = sorted(set(store.home_rows) | set(store.away_rows))
+        self.team_ids = {team: i for i, team in enumerate(self.teams)}
+        values, team_idx, venue = [], [], []
+        for venue_code, rows_by_team in ((HOME, store.home_rows), (AWAY, store.away_rows)):
+            for team, rows in rows_by_team.items():
+                for row in rows:
+                    values.append(row_values(row))
+                    team_idx.append(self.team_ids[team])
+                    venue.append(venue_code)
+
+        self.values = np.array(values, dtype=np.float64).reshape(len(values), len(AVERAGE_COLUMNS))
+        self.team_idx = np.array(team_idx, dtype=np.intp)
+        self.venue = np.array(venue, dtype=np.intp)
+        goal_diff = self.values[:, 0] - self.values[:, 1]
+        self.result = np.where(goal_diff > 0, WIN, np.where(goal_diff == 0, DRAW, LOSS))
+
+        # (team, venue) -> mean of each column, for every team at once
+        group = self.team_idx * 2 + self.venue
+        n_groups = len(self.teams) * 2
+        sums = np.zeros((n_groups, len(AVERAGE_COLUMNS)))
+        np.add.at(sums, group, self.values)
+        self.counts = np.bincount(group, minlength=n_groups).reshape(len(self.teams), 2)
+        counts = self.counts.reshape(n_groups, 1)
+        self.means = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0) \
+            .reshape(len(self.teams), 2, len(AVERAGE_COLUMNS))
+
+    def team_averages(self, team: int) -> dict:
+        index = self.team_ids.get(team)
+        averages = {}
+        for venue_name, venue_code in (('home', HOME), ('away', AWAY)):
+            if index is None:
+                means, matches = np.zeros(len(AVERAGE_COLUMNS)), 0
+            else:
+                means, matches = self.means[index, venue_code], int(self.counts[index, venue_code])
+            averages[venue_name] = {'averages': dict(zip(AVERAGE_COLUMNS, means.tolist())), 'matches': matches}
+        return averages
+
+# ------------------------
+# Form queries
+# ------------------------
+def get_form(store: MatchStore, team: str, windows: tuple = (3, 5, 10)) -> dict:
+    """{n: mean of every stat over the team's last n matches} for each window size."""
+    return store.form.rolling_means(team_id(team), windows)
+
+def get_decayed_form(store: MatchStore, team: str, half_life: float = 5.0) -> dict:
+    """Exponentially decayed mean of every stat (half_life in matches)."""
+    return store.form.decayed_mean(team_id(team), half_life)
+
 # ------------------------
 # Helper to add extra columns for output rows
 # ------------------------
@@ -119,88 +284,59 @@ def add_extra_columns(row: dict, role: str, team_of_interest: str = None) -> dic
 # ------------------------
 # Analysis Functions using Grouped Matches
 # ------------------------
-def find_last_head_to_head_group(dedup_matches: dict, team1: str, team2: str) -> dict:
+def find_last_head_to_head_group(store: MatchStore, team1: str, team2: str) -> dict:
     """
     Find the most recent head-to-head match between team1 and team2.
     Returns the match group (both home and away rows) for that game.
     """
-    team1 = normalize_team_name(team1)
-    team2 = normalize_team_name(team2)
-    groups = []
-    for group in dedup_matches.values():
-        home_team = group['home']['team'] if group['home'] else ""
-        away_team = group['away']['team'] if group['away'] else ""
-        if (home_team == team1 and away_team == team2) or (home_team == team2 and away_team == team1):
-            groups.append(group)
-    if not groups:
-        return {}
-    groups.sort(key=lambda g: int(g['home']['match_id']), reverse=True)
-    return groups[0]
+    return store.last_head_to_head(team_id(team1), team_id(team2))
 
-def get_last_five_match_groups(dedup_matches: dict, team: str) -> list:
+def get_last_five_match_groups(store: MatchStore, team: str) -> list:
     """
     Get the last five match groups in which the given team participated.
     Each group represents one game (two rows).
     """
-    team = normalize_team_name(team)
-    groups = []
-    for group in dedup_matches.values():
-        home_team = group['home']['team'] if group['home'] else ""
-        away_team = group['away']['team'] if group['away'] else ""
-        if team == home_team or team == away_team:
-            groups.append(group)
-    groups.sort(key=lambda g: int(g['home']['match_id']), reverse=True)
-    return groups[:5]
+    return store.last_n(team_id(team), 5)
 
-def calculate_averages_dedup(dedup_matches: dict, team: str) -> dict:
+def calculate_averages_dedup(store: MatchStore, team: str) -> dict:
     """
     Calculate average stats for a team over deduplicated matches.
     Home matches are taken from the home row.
     Away matches are taken from the away row (with the result inverted for clarity).
     """
-    team = normalize_team_name(team)
-    home_rows = []
-    away_rows = []
-    for group in dedup_matches.values():
-        home_team = group['home']['team'] if group['home'] else ""
-        away_team = group['away']['team'] if group['away'] else ""
-        if team == home_team:
-            home_rows.append(group['home'])
-        elif group['away'] is not None and team == away_team:
-            row = group['away'].copy()
-            home_goals, away_goals = parse_result(row['RESULT'])
-            row['RESULT'] = f"{away_goals}–{home_goals}"
-            away_rows.append(row)
-    
-    stat_fields = [
-        'Accurate passes', 'Aerial duels', 'Ball possession', 'Big chances', 'Big chances missed', 
-        'Big chances scored', 'Big saves', 'Blocked shots', 'Clearances', 'Corner kicks', 'Crosses', 
-        'Dispossessed', 'Dribbles', 'Duels', 'Errors lead to a goal', 'Errors lead to a shot', 
-        'Expected goals', 'Final third entries', 'Final third phase', 'Fouled in final third', 
-        'Fouls', 'Free kicks', 'Goal kicks', 'Goalkeeper saves', 'Goals prevented', 'Ground duels', 
-        'High claims', 'Hit woodwork', 'Interceptions', 'Long balls', 'Offsides', 'Passes', 
-        'Penalty saves', 'Punches', 'Recoveries', 'Red cards', 'Shots inside box', 'Shots off target', 
-        'Shots on target', 'Shots outside box', 'Tackles', 'Tackles won', 'Through balls', 'Throw-ins', 
-        'Total saves', 'Total shots', 'Total tackles', 'Touches in penalty area', 'Yellow cards'
-    ]
-    
-    def compute_stats(rows):
-        stats = defaultdict(lambda: {'sum': 0.0, 'count': 0})
-        for row in rows:
-            home_goals, away_goals = parse_result(row['RESULT'])
-            stats['Goals scored']['sum'] += home_goals
-            stats['Goals conceded']['sum'] += away_goals
-            stats['Goals scored']['count'] += 1
-            stats['Goals conceded']['count'] += 1
-            for field in stat_fields:
-                stats[field]['sum'] += parse_stat(row.get(field, ''))
-                stats[field]['count'] += 1
-        return {field: (stats[field]['sum'] / stats[field]['count'] if stats[field]['count'] > 0 else 0.0)
-                for field in ['Goals scored', 'Goals conceded'] + stat_fields}
-    
+    return store.matrix.team_averages(team_id(team))
+
+# ------------------------
+# Report contents
+# ------------------------
+def team_summary(store: MatchStore, team: str) -> dict:
+    """Per-team report sections, shared by every pairing the team appears in."""
     return {
-        'home': {'averages': compute_stats(home_rows), 'matches': len(home_rows)},
-        'away': {'averages': compute_stats(away_rows), 'matches': len(away_rows)}
+        'last_five': get_last_five_match_groups(store, team),
+        'averages': calculate_averages_dedup(store, team),
+    }
+
+def period_report(store: MatchStore, team1: str, team2: str, summaries: dict = None) -> dict:
+    """
+    Everything write_period_output renders for one pairing, as plain data
+    (picklable, so it can be handed to a worker process). summaries maps
+    normalized team -> team_summary; teams missing from it are computed here.
+    """
+    summaries = summaries if summaries is not None else {}
+    sections = []
+    for team in (team1, team2):
+        key = normalize_team_name(team)
+        if key not in summaries:
+            summaries[key] = team_summary(store, team)
+        sections.append(summaries[key])
+    return {
+        'team1': team1,
+        'team2': team2,
+        'head_to_head': find_last_head_to_head_group(store, team1, team2),
+        'team1_groups': sections[0]['last_five'],
+        'team2_groups': sections[1]['last_five'],
+        'team1_averages': sections[0]['averages'],
+        'team2_averages': sections[1]['averages'],
     }
 
 # ------------------------
@@ -212,126 +348,181 @@ def write_period_output(period: str, rows: list[dict], team1: str, team2: str, o
     For head-to-head and last 5 matches, both rows for each match are output
     with extra columns indicating perspective and adjusted result.
     """
-    # Group rows by match_id
-    dedup_matches = deduplicate_matches(rows)
-    
-    # --- Section 1: Head-to-Head Match ---
-    head_to_head_group = find_last_head_to_head_group(dedup_matches, team1, team2)
-    
-    # --- Section 2: Last 5 Matches for team1 ---
-    team1_groups = get_last_five_match_groups(dedup_matches, team1)
-    
-    # --- Section 3: Last 5 Matches for team2 ---
-    team2_groups = get_last_five_match_groups(dedup_matches, team2)
-    
-    # --- Averages ---
-    team1_averages = calculate_averages_dedup(dedup_matches, team1)
-    team2_averages = calculate_averages_dedup(dedup_matches, team2)
-    
-    wb = Workbook()
-    ws = wb.active
-    
+    # Group rows by match_id and index them by team once
+    store = MatchStore(deduplicate_matches(rows))
+    render_period_report(period, period_report(store, team1, team2), output_filename)
+
+def augmented_rows(groups: list, team_of_interest: str = None) -> list[list]:
+    """
+    add_extra_columns applied once per row of each group. Returns one list of
+    augmented rows per group (home row, then away row if there is one).
+    """
+    team = normalize_team_name(team_of_interest) if team_of_interest else None
+    rows = []
+    for group in groups:
+        augmented = [add_extra_columns(group['home'], "home", team)]
+        if group['away']:
+            augmented.append(add_extra_columns(group['away'], "away", team))
+        rows.append(augmented)
+    return rows
+
+def report_rows(period: str, report: dict):
+    """Yield the sheet rows of one period_report, top to bottom."""
+    team1, team2 = normalize_team_name(report['team1']), normalize_team_name(report['team2'])
+
     # Write period title
-    ws.append([f"{period} Analysis"])
-    ws.append([])  # blank row
-    
+    yield [f"{period} Analysis"]
+    yield []  # blank row
+
     # Section 1: Head-to-Head Match
-    ws.append(["Head-to-Head Match"])
-    if head_to_head_group:
-        home_aug = add_extra_columns(head_to_head_group['home'], "home")
-        header = list(home_aug.keys())
-        ws.append(header)
-        ws.append(list(add_extra_columns(head_to_head_group['home'], "home").values()))
-        if head_to_head_group['away']:
-            ws.append(list(add_extra_columns(head_to_head_group['away'], "away").values()))
-    else:
-        ws.append(["No head-to-head match found."])
-    ws.append([])
-    
-    # Section 2: Last 5 Matches for team1
-    ws.append([f"Last 5 Matches for {normalize_team_name(team1)}"])
-    if team1_groups:
-        header = list(add_extra_columns(team1_groups[0]['home'], "home", team1).keys())
-        ws.append(header)
-        for group in team1_groups:
-            ws.append(list(add_extra_columns(group['home'], "home", team1).values()))
-            if group['away']:
-                ws.append(list(add_extra_columns(group['away'], "away", team1).values()))
-            ws.append([])  # blank row between matches
+    yield ["Head-to-Head Match"]
+    if report['head_to_head']:
+        match_rows = augmented_rows([report['head_to_head']])[0]
+        yield list(match_rows[0].keys())
+        for row in match_rows:
+            yield list(row.values())
     else:
-        ws.append([f"No matches found for {normalize_team_name(team1)}."])
-    ws.append([])
-    
-    # Section 3: Last 5 Matches for team2
-    ws.append([f"Last 5 Matches for {normalize_team_name(team2)}"])
-    if team2_groups:
-        header = list(add_extra_columns(team2_groups[0]['home'], "home", team2).keys())
-        ws.append(header)
-        for group in team2_groups:
-            ws.append(list(add_extra_columns(group['home'], "home", team2).values()))
-            if group['away']:
-                ws.append(list(add_extra_columns(group['away'], "away", team2).values()))
-            ws.append([])
-    else:
-        ws.append([f"No matches found for {normalize_team_name(team2)}."])
-    ws.append([])
-    
+        yield ["No head-to-head match found."]
+    yield []
+
+    # Sections 2 and 3: Last 5 Matches for each team
+    for team, groups in ((team1, report['team1_groups']), (team2, report['team2_groups'])):
+        yield [f"Last 5 Matches for {team}"]
+        if groups:
+            match_rows = augmented_rows(groups, team)
+            yield list(match_rows[0][0].keys())
+            for rows in match_rows:
+                for row in rows:
+                    yield list(row.values())
+                yield []  # blank row between matches
+        else:
+            yield [f"No matches found for {team}."]
+        yield []
+
     # Section 4: Averages
-    ws.append(["Averages"])
-    columns_order = ['Goals scored', 'Goals conceded'] + [
-        'Accurate passes', 'Aerial duels', 'Ball possession', 'Big chances', 'Big chances missed', 
-        'Big chances scored', 'Big saves', 'Blocked shots', 'Clearances', 'Corner kicks', 'Crosses', 
-        'Dispossessed', 'Dribbles', 'Duels', 'Errors lead to a goal', 'Errors lead to a shot', 
-        'Expected goals', 'Final third entries', 'Final third phase', 'Fouled in final third', 
-        'Fouls', 'Free kicks', 'Goal kicks', 'Goalkeeper saves', 'Goals prevented', 'Ground duels', 
-        'High claims', 'Hit woodwork', 'Interceptions', 'Long balls', 'Offsides', 'Passes', 
-        'Penalty saves', 'Punches', 'Recoveries', 'Red cards', 'Shots inside box', 'Shots off target', 
-        'Shots on target', 'Shots outside box', 'Tackles', 'Tackles won', 'Through balls', 'Throw-ins', 
-        'Total saves', 'Total shots', 'Total tackles', 'Touches in penalty area', 'Yellow cards'
-    ]
-    
-    ws.append([f"Averages for {normalize_team_name(team1)}"])
-    for venue in ['home', 'away']:
-        ws.append(["Venue", "Matches"] + columns_order)
-        row = [venue.capitalize(), team1_averages[venue]['matches']] + [
-            f"{team1_averages[venue]['averages'].get(col, 0.0):.2f}" for col in columns_order
-        ]
-        ws.append(row)
-    ws.append([])
-    
-    ws.append([f"Averages for {normalize_team_name(team2)}"])
-    for venue in ['home', 'away']:
-        ws.append(["Venue", "Matches"] + columns_order)
-        row = [venue.capitalize(), team2_averages[venue]['matches']] + [
-            f"{team2_averages[venue]['averages'].get(col, 0.0):.2f}" for col in columns_order
-        ]
-        ws.append(row)
-    
+    yield ["Averages"]
+    for i, (team, averages) in enumerate(((team1, report['team1_averages']), (team2, report['team2_averages']))):
+        if i:
+            yield []
+        yield [f"Averages for {team}"]
+        for venue in ['home', 'away']:
+            yield ["Venue", "Matches"] + AVERAGE_COLUMNS
+            yield [venue.capitalize(), averages[venue]['matches']] + [
+                f"{averages[venue]['averages'].get(col, 0.0):.2f}" for col in AVERAGE_COLUMNS
+            ]
+
+def render_period_report(period: str, report: dict, output_filename: str):
+    """Write one period_report to an XLSX file, streaming rows in write-only mode."""
+    render_reports([(period, report)], output_filename, sheet_titles=False)
+
+def render_reports(period_reports: list, output_filename: str, sheet_titles: bool = True):
+    """
+    Write several (period, report) pairs into one workbook, one sheet each
+    (titled by period unless sheet_titles is False). openpyxl's write-only
+    mode streams rows to disk instead of holding every cell in memory.
+    """
+    from openpyxl import Workbook  # only report writing needs openpyxl
+
+    wb = Workbook(write_only=True)
+    for period, report in period_reports:
+        ws = wb.create_sheet(title=period if sheet_titles else None)
+        for row in report_rows(period, report):
+            ws.append(row)
     wb.save(output_filename)
 
+# ------------------------
+# Batch reports: a whole matchday or every pairing in one run
+# ------------------------
+def report_filename(period: str, team1: str, team2: str, out_dir: str = ".") -> str:
+    """<period>_<team1>_vs_<team2>.xlsx, or <team1>_vs_<team2>.xlsx for a combined workbook (period=None)."""
+    prefix = f"{period.replace(' ', '_').lower()}_" if period else ""
+    return os.path.join(out_dir, f"{prefix}{normalize_team_name(team1)}_vs_{normalize_team_name(team2)}.xlsx")
+
+def matchday_pairings(round_number: int) -> list[tuple[str, str]]:
+    """(home, away) for every fixture of a round, from the SofaScore round snapshots."""
+    from fixtureindex import load_fixtures
+    return [(normalize_team_name(fixture.home), normalize_team_name(fixture.away))
+            for fixture in load_fixtures() if fixture.round == round_number]
+
+def all_pairings(datasets: dict) -> list[tuple[str, str]]:
+    """Every pairing of the teams in the full-match data (190 for a 20-team league)."""
+    return list(combinations(sorted({row['team'] for row in datasets['Full Match']}), 2))
+
+def _render_job(job: tuple) -> str:
+    period_reports, output_filename, sheet_titles = job
+    render_reports(period_reports, output_filename, sheet_titles)
+    return output_filename
+
+def write_batch_reports(datasets: dict, pairings: list, out_dir: str = ".", max_workers: int = None,
+                        combined: bool = False) -> list[str]:
+    """
+    Write every period's report for every pairing, one file per period or,
+    with combined=True, one workbook per pairing with a sheet per period.
+    Each period is grouped and indexed once and each team's last five /
+    averages computed once; only the workbook rendering runs per pairing,
+    spread over a process pool (one worker per core unless max_workers says otherwise).
+    """
+    stores = {period: MatchStore(deduplicate_matches(rows)) for period, rows in datasets.items()}
+    summaries = {period: {} for period in stores}
+    jobs = []
+    for team1, team2 in pairings:
+        period_reports = [(period, period_report(store, team1, team2, summaries[period]))
+                          for period, store in stores.items()]
+        if combined:
+            jobs.append((period_reports, report_filename(None, team1, team2, out_dir), True))
+        else:
+            jobs.extend(([(period, report)], report_filename(period, team1, team2, out_dir), False)
+                        for period, report in period_reports)
+
+    os.makedirs(out_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_render_job, jobs, chunksize=4))
+
 # ------------------------
 # Main: File Paths & Team Names set in Code
 # ------------------------
-def main():
+def main(round_number: int = None, all_pairs: bool = False, out_dir: str = ".", max_workers: int = None,
+         combined: bool = False):
     # Supply the CSV file paths and team names here
     full_csv = "/Users/jd/Documents/PremierLeagueModel/matches_ALL.csv"         # Path to the full match CSV
     first_half_csv = "/Users/jd/Documents/PremierLeagueModel/matches_1ST.csv"     # Path to the first half CSV
     second_half_csv = "/Users/jd/Documents/PremierLeagueModel/matches_2ND.csv"    # Path to the second half CSV
+    long_csv = "/Users/jd/Documents/PremierLeagueModel/matches_LONG.csv"          # All periods in one file (optional)
     team1 = "Man Utd"                    # First team name
     team2 = "Chelsea"                    # Second team name
 
-    # Load all three datasets
-    datasets = {
-        'Full Match': load_matches(full_csv),
-        'First Half': load_matches(first_half_csv),
-        'Second Half': load_matches(second_half_csv)
-    }
+    # Load all three datasets (one read if the scraper wrote the long format)
+    datasets = load_datasets(full_csv, first_half_csv, second_half_csv, long_csv)
     
+    # Batch mode: one run for a matchday's fixtures or every pairing
+    if round_number is not None or all_pairs:
+        pairings = all_pairings(datasets) if all_pairs else matchday_pairings(round_number)
+        written = write_batch_reports(datasets, pairings, out_dir, max_workers, combined)
+        print(f"{len(written)} reports for {len(pairings)} pairings written to {out_dir}")
+        return
+
+    # One workbook with a sheet per period
+    if combined:
+        output_filename = report_filename(None, team1, team2, out_dir)
+        render_reports([(period, period_report(MatchStore(deduplicate_matches(rows)), team1, team2))
+                        for period, rows in datasets.items()], output_filename)
+        print(f"Output written to {output_filename}")
+        return
+
     # Process each period and write an output XLSX file
     for period, rows in datasets.items():
-        output_filename = f"{period.replace(' ', '_').lower()}_{normalize_team_name(team1)}_vs_{normalize_team_name(team2)}.xlsx"
+        output_filename = report_filename(period, team1, team2, out_dir)
         write_period_output(period, rows, team1, team2, output_filename)
         print(f"Output written to {output_filename}")
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="Head-to-head XLSX reports.")
+    parser.add_argument("--round", type=int, dest="round_number", help="report every fixture of this round")
+    parser.add_argument("--all-pairs", action="store_true", help="report every pairing of teams")
+    parser.add_argument("--combined", action="store_true", help="one workbook per pairing, a sheet per period")
+    parser.add_argument("--out-dir", default=".")
+    parser.add_argument("--workers", type=int, default=None, help="render processes (default: one per core)")
+    args = parser.parse_args()
+    main(round_number=args.round_number, all_pairs=args.all_pairs, out_dir=args.out_dir, max_workers=args.workers,
+         combined=args.combined)
@@ -0,0 +1,132 @@
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+# ------------------------
+# Shared HTTP client for all scrapers
+# ------------------------
+# One keep-alive session per thread (curl_cffi sessions are not thread-safe)
+# and one token bucket per host, so every scraper gets the fastest rate a
+# source tolerates instead of a fixed worst-case sleep per request.
+
+IMPERSONATE = "chrome"
+
+# host -> (requests per second, burst). None disables limiting for that host.
+HOST_RATES = {
+    "www.sofascore.com": (4.0, 8),
+    "api.sofascore.com": (4.0, 8),
+    "fbref.com": (0.16, 1),  # FBref blocks clients above ~10 requests/minute
+    "127.0.0.1": None,
+    "localhost": None,
+}
+DEFAULT_RATE = (1.0, 1)
+MAX_RETRIES = 3
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            # Reserve the token now and sleep outside the lock, so waiting
+            # threads queue up in order instead of spinning.
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+_local = threading.local()
+
+
+def set_rate(host: str, rate: float = None, burst: int = 1):
+    """Override the limit for a host; rate=None disables limiting."""
+    with _limiters_lock:
+        HOST_RATES[host] = None if rate is None else (rate, burst)
+        _limiters.pop(host, None)
+
+
+def limiter_for(host: str):
+    with _limiters_lock:
+        if host not in _limiters:
+            settings = HOST_RATES.get(host, DEFAULT_RATE)
+            _limiters[host] = TokenBucket(*settings) if settings else None
+        return _limiters[host]
+
+
+def session():
+    """Return this thread's pooled keep-alive session."""
+    if getattr(_local, "session", None) is None:
+        # curl_cffi is imported on first request so importing scrapers stays cheap.
+        from curl_cffi import requests
+        _local.session = requests.Session(impersonate=IMPERSONATE)
+    return _local.session
+
+
+def get(url: str, **kwargs):
+    """
+    GET through the pooled session, waiting on the host's token bucket first.
+    429/503 responses are retried after Retry-After (or a back-off) seconds.
+    """
+    limiter = limiter_for(urlsplit(url).hostname)
+    for attempt in range(MAX_RETRIES + 1):
+        if limiter:
+            limiter.acquire()
+        resp = session().get(url, **kwargs)
+        if resp.status_code not in (429, 503) or attempt == MAX_RETRIES:
+            return resp
+        retry_after = resp.headers.get("Retry-After", "")
+        time.sleep(float(retry_after) if retry_after.isdigit() else 2 ** attempt)
+
+
+def get_json(url: str, **kwargs):
+    resp = get(url, **kwargs)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def conditional_get(url: str, cache_path: str, **kwargs):
+    """
+    GET with ETag / Last-Modified revalidation against a body cached at
+    cache_path (validators live in cache_path + '.meta.json').
+    Returns (text, changed); changed is False when the server answered 304.
+    """
+    meta_path = f"{cache_path}.meta.json"
+    headers = dict(kwargs.pop("headers", None) or {})
+    meta = {}
+    if os.path.exists(cache_path) and os.path.exists(meta_path):
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    resp = get(url, headers=headers, **kwargs)
+    if resp.status_code == 304 and meta:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return f.read(), False
+    resp.raise_for_status()
+
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    with open(f"{cache_path}.tmp", "w", encoding="utf-8") as f:
+        f.write(resp.text)
+    os.replace(f"{cache_path}.tmp", cache_path)
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({"etag": resp.headers.get("ETag"), "last_modified": resp.headers.get("Last-Modified")}, f)
+    return resp.text, True
+
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+from fixtureindex import load_fixtures
+from teamregistry import normalize_team_name
+from matchreports import REPORT_CSV
+
+# ------------------------
+# Matchday export of the FBref per-match stats
+# ------------------------
+# Replaces the notebook's row loops. Matchdays come from the SofaScore round
+# index, joined on (home, away), instead of "every 20 rows". Rows the index
+# does not know fall back to that positional rule. The separated layout
+# (a blank row between matchdays) is built with one concat and a stable sort.
+# The XLSX is streamed in openpyxl write-only mode: an "All" sheet plus one
+# sheet per matchday. With a matchday_dir each matchday also gets its own
+# file, rewritten only when that matchday's rows change.
+
+EXPORT_XLSX = "statspermatchfinal.xlsx"
+MANIFEST = ".matchdays.json"
+ROWS_PER_MATCHDAY = 20
+
+
+def fixture_rounds() -> pd.DataFrame:
+    """home, away, round for every fixture; a played (FT) entry wins over a postponed one."""
+    fixtures = pd.DataFrame(load_fixtures())
+    fixtures["home"] = fixtures["home"].map(normalize_team_name)
+    fixtures["away"] = fixtures["away"].map(normalize_team_name)
+    fixtures = fixtures.sort_values("status", key=lambda s: s == "FT", kind="stable")
+    return fixtures.drop_duplicates(["home", "away"], keep="last")[["home", "away", "round"]]
+
+
+def assign_matchdays(frame: pd.DataFrame, rounds: pd.DataFrame = None) -> pd.DataFrame:
+    """Copy of frame with a Matchday column (see module comment)."""
+    rounds = fixture_rounds() if rounds is None else rounds
+    names = pd.unique(pd.concat([frame["Team"], frame["Opponent"]]))
+    slugs = {name: normalize_team_name(name) for name in names}
+    team, opponent = frame["Team"].map(slugs).to_numpy(), frame["Opponent"].map(slugs).to_numpy()
+    is_home = (frame["Home/Away"] == "Home").to_numpy()
+    keys = pd.DataFrame({"home": np.where(is_home, team, opponent), "away": np.where(is_home, opponent, team)})
+    matched = keys.merge(rounds, on=["home", "away"], how="left")["round"].to_numpy()
+
+    positional = np.arange(len(frame)) // ROWS_PER_MATCHDAY + 1
+    out = frame.copy()
+    out["Matchday"] = np.where(np.isnan(matched.astype(float)), positional, matched).astype(int)
+    return out
+
+
+def separated_layout(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rows ordered by matchday (stable) with one blank row between matchdays.
+    Integer columns become nullable Int64 so the blank rows do not turn
+    counts into floats (1 -> 1.0) in the export.
+    """
+    matchdays = np.sort(frame["Matchday"].unique())
+    blanks = pd.DataFrame({"Matchday": matchdays[:-1], "_blank": 1})
+    integers = {c: "Int64" for c in frame.columns if pd.api.types.is_integer_dtype(frame[c])}
+    rows = frame.astype(integers).assign(_blank=0)
+    combined = pd.concat([rows, blanks], ignore_index=True)
+    combined = combined.sort_values(["Matchday", "_blank"], kind="stable")
+    combined["Matchday"] = combined["Matchday"].mask(combined["_blank"] == 1)
+    return combined.drop(columns="_blank").reset_index(drop=True)
+
+
+def _cells(frame: pd.DataFrame):
+    """Row lists with NaN as empty cells."""
+    return frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None)
+
+
+def _write_workbook(path: str, sheets):
+    from openpyxl import Workbook  # only the export needs openpyxl
+
+    wb = Workbook(write_only=True)
+    for title, frame in sheets:
+        ws = wb.create_sheet(title=title)
+        ws.append(list(frame.columns))
+        for row in _cells(frame):
+            ws.append(list(row))
+    wb.save(path)
+
+
+def _read_manifest(folder: str) -> dict:
+    try:
+        with open(os.path.join(folder, MANIFEST), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def export_matchdays(csv_path: str = REPORT_CSV, xlsx_path: str = EXPORT_XLSX, matchday_dir: str = None) -> list[str]:
+    """
+    Assign matchdays to csv_path, stream the separated layout and one sheet
+    per matchday to xlsx_path, and (with matchday_dir) refresh the per-matchday
+    files whose rows changed. Returns the paths written.
+    """
+    frame = assign_matchdays(pd.read_csv(csv_path))
+    groups = [(int(matchday), group) for matchday, group in frame.groupby("Matchday", sort=True)]
+
+    sheets = [("All", separated_layout(frame))]
+    sheets += ((f"Matchday {matchday}", group) for matchday, group in groups)
+    _write_workbook(xlsx_path, sheets)
+    written = [xlsx_path]
+
+    if matchday_dir:
+        os.makedirs(matchday_dir, exist_ok=True)
+        manifest = _read_manifest(matchday_dir)
+        for matchday, group in groups:
+            digest = hashlib.sha256(group.to_csv(index=False).encode("utf-8")).hexdigest()
+            path = os.path.join(matchday_dir, f"matchday_{matchday:02d}.xlsx")
+            if manifest.get(str(matchday)) == digest and os.path.exists(path):
+                continue
+            _write_workbook(path, [(f"Matchday {matchday}", group)])
+            manifest[str(matchday)] = digest
+            written.append(path)
+        with open(os.path.join(matchday_dir, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1)
+    return written
+
+
+if __name__ == "__main__":
+    paths = export_matchdays(*sys.argv[1:3], matchday_dir=sys.argv[3] if len(sys.argv) > 3 else None)
+    print(f"Wrote {len(paths)} file(s): {', '.join(paths)}")
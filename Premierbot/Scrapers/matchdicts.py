@@ -1,73 +1,39 @@
-from bs4 import BeautifulSoup
+from functools import lru_cache
+from fixtureindex import load_fixtures, parse_round_file
+from teamregistry import normalize_team_name
 
-team_name_mapping = {
-    'Manchester Utd': 'man-utd',
-    'Fulham': 'fulham',
-    'Ipswich Town': 'ipswich',
-    'Liverpool': 'liverpool',
-    'Newcastle Utd': 'newcastle',
-    "Nott'ham Forest": 'forest',
-    'Southampton': 'southampton',
-    'West Ham': 'west-ham',
-    'Aston Villa': 'aston-villa',
-    'Crystal Palace': 'crystal-palace',
-    'Brentford': 'brentford',
-    'Manchester City': 'man-city',
-    'Leicester City': 'leicester',
-    'Chelsea': 'chelsea',
-    'Everton': 'everton',
-    'Brentford': 'brentford',
-    'Watford': 'watford',
-    'Tottenham': 'tottenham',
-    'Wolves': 'wolves',
-    'Arsenal': 'arsenal',
-    'Brighton': 'brighton',
-    }
-
-mapping = {k.lower(): v for k, v in team_name_mapping.items()}
-
-def normalize_team_name(raw_name:str) -> str:
-    lower_name = raw_name.strip().lower()
-    return mapping.get(lower_name, lower_name.replace(" ", "-"))
+# Team names go through the shared registry (teamregistry), so these slugs
+# line up with the FBref results and the head-to-head analysis.
 
 def build_match_team_dict(file_path: str) -> dict:
     """
-    Reads an HTML file from the given path and returns a dictionary:
+    Reads a round HTML file from the given path and returns a dictionary:
       {
-        "12436965": {"home": "southampton", "away": "brighton-and-hove-albion"},
+        "12436965": {"home": "southampton", "away": "brighton"},
         ...
       }
     """
-    with open(file_path, "r", encoding="utf-8") as f:
-        html = f.read()
-    soup = BeautifulSoup(html, "html.parser")
-
-    match_dict = {}
-    for a_tag in soup.find_all("a", attrs={"data-testid": "event_cell"}):
-        match_id = a_tag.get("data-id", "")
-        if not match_id:
-            continue
-
-        left_div = a_tag.find("div", attrs={"data-testid": "left_team"})
-        right_div = a_tag.find("div", attrs={"data-testid": "right_team"})
-        if not left_div or not right_div:
-            continue
-
-        raw_home_team = left_div.get_text(strip=True).lower().replace(" ", "-")
-        raw_away_team = right_div.get_text(strip=True).lower().replace(" ", "-")
-        home_team = normalize_team_name(raw_home_team)
-        away_team = normalize_team_name(raw_away_team)
-
-        match_dict[match_id] = {"home": home_team, "away": away_team}
+    return {
+        fixture.match_id: {"home": normalize_team_name(fixture.home), "away": normalize_team_name(fixture.away)}
+        for fixture in parse_round_file(file_path, 0)
+        if fixture.home and fixture.away
+    }
 
-    return match_dict
+@lru_cache(maxsize=None)
+def get_all_match_dict() -> dict:
+    """Merge every round from the cached fixture index (built on first use)."""
+    return {
+        fixture.match_id: {"home": normalize_team_name(fixture.home), "away": normalize_team_name(fixture.away)}
+        for fixture in load_fixtures()
+        if fixture.home and fixture.away
+    }
 
-# Merge dictionaries from rounds 1 to 26
-all_match_dict = {}
-for i in range(1, 29):
-    path = f"/Users/jd/Documents/PremierLeagueModel/PremierLeagueModel/htmlscripts/Dataids/round{i}.txt"
-    round_dict = build_match_team_dict(path)
-    all_match_dict.update(round_dict)
+def __getattr__(name):
+    # Keep `from matchdicts import all_match_dict` working without parsing at import time.
+    if name == "all_match_dict":
+        return get_all_match_dict()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-print("Merged match team dictionary:")
-print(all_match_dict)
+if __name__ == "__main__":
+    print("Merged match team dictionary:")
+    print(get_all_match_dict())
@@ -0,0 +1,223 @@
+import hashlib
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from httpclient import get
+from resultscraper import base_url, main_url, headers, SCHEDULE_CACHE
+
+# ------------------------
+# FBref match-report scraper (was inline in statsforeachmatch.ipynb)
+# ------------------------
+# Match reports are fetched on a thread pool through httpclient, whose
+# per-host token bucket keeps fbref.com at its polite rate, so a backfill is
+# bounded by that rate rather than by parsing. Every good page is stored
+# under REPORT_CACHE and is never downloaded twice. Error responses and pages
+# without team stats are not cached. Only the team_stats and
+# team_stats_extra divs are built into a tree, with lxml when it is installed.
+
+REPORT_CACHE = os.path.join("fbrefcache", "reports")
+MAX_WORKERS = 4
+REPORT_CSV = "statspermatch.csv"
+
+# "280 of 393 — 71%" and "71% — 280 of 393" both carry the same two parts.
+RATIO = re.compile(r"(\d+)\s+of\s+(\d+)")
+PERCENT = re.compile(r"(\d+)%")
+MATCH_ID = re.compile(r"/matches/([0-9a-f]+)/")
+
+
+def _parser() -> str:
+    try:
+        import lxml  # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
+
+def parse_ratio(text: str):
+    """(made, total) from '8 of 18 — 44%' in either order, or (None, None)."""
+    m = RATIO.search(text)
+    return (m.group(1), m.group(2)) if m else (None, None)
+
+
+def parse_percent(text: str):
+    """The percentage of a 'made of total — pct%' cell, or None."""
+    if not RATIO.search(text):
+        return None
+    m = PERCENT.search(text)
+    return m.group(1) if m else None
+
+
+def report_links(schedule_html: str) -> list[dict]:
+    """Played fixtures with a match-report link: home, away, score, url."""
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    soup = BeautifulSoup(schedule_html, _parser(), parse_only=SoupStrainer("table", id=re.compile(r"^sched")))
+    links = []
+    for match in soup.find_all("tr"):
+        row_classes = match.get("class", [])
+        if "spacer" in row_classes or "partial_table_header" in row_classes:
+            continue
+        home_team_el = match.find("td", {"data-stat": "home_team"})
+        away_team_el = match.find("td", {"data-stat": "away_team"})
+        score_el = match.find("td", {"data-stat": "score"})
+        report_cell = match.find("td", {"data-stat": "match_report"})
+        link_tag = report_cell.find("a") if report_cell else None
+        if not (home_team_el and away_team_el and score_el and link_tag):
+            continue
+        links.append({
+            "home": home_team_el.text.strip(),
+            "away": away_team_el.text.strip(),
+            "score": score_el.text.strip(),
+            "url": base_url + link_tag["href"],
+        })
+    return links
+
+
+def report_cache_path(url: str, cache_dir: str = REPORT_CACHE) -> str:
+    match_id = MATCH_ID.search(url)
+    name = match_id.group(1) if match_id else hashlib.sha256(url.encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"{name}.html")
+
+
+def fetch_report(url: str, cache_dir: str = REPORT_CACHE) -> str:
+    """
+    Page HTML, from the on-disk cache when present; otherwise fetched and
+    stored. Error responses raise, and a 200 page without the team stats
+    (a block or challenge page) is returned but not cached, so it is fetched
+    again next run.
+    """
+    path = report_cache_path(url, cache_dir)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    resp = get(url, headers=headers)
+    resp.raise_for_status()
+    html = resp.text
+    if 'id="team_stats' not in html:
+        return html
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        f.write(html)
+    os.replace(f"{path}.tmp", path)
+    return html
+
+
+def fetch_reports(urls: list[str], max_workers: int = MAX_WORKERS, cache_dir: str = REPORT_CACHE):
+    """Yield (url, html, error) in input order, fetching concurrently."""
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(fetch_report, url, cache_dir) for url in urls]
+        for url, future in zip(urls, futures):
+            try:
+                yield url, future.result(), None
+            except Exception as e:
+                yield url, None, e
+
+
+def _parse_extra(section, home_stats: dict, away_stats: dict):
+    """team_stats_extra: grids of home value / stat name / away value divs."""
+    grids = [g for g in section.find_all("div", recursive=False) if g.find("div")]
+    for grid in grids:
+        divs = grid.find_all("div")
+        for i in range(3, len(divs) - 2, 3):
+            stat_name = divs[i + 1].text.strip()
+            home_stats[stat_name] = divs[i].text.strip()
+            away_stats[stat_name] = divs[i + 2].text.strip()
+    return bool(grids)
+
+
+def _parse_team_stats(section, home_stats: dict, away_stats: dict):
+    """team_stats: a label row (th colspan=2) followed by a home/away data row."""
+    table = section.find("table")
+    if not table:
+        return
+    rows = (table.find("tbody") or table).find_all("tr")
+    i = 0
+    while i < len(rows) - 1:
+        label_th = rows[i].find("th", colspan="2")
+        if not label_th:
+            i += 1
+            continue
+        label = label_th.get_text(strip=True)
+        tds = rows[i + 1].find_all("td")
+        i += 2
+        if len(tds) < 2:
+            continue
+        for td, stats in ((tds[0], home_stats), (tds[1], away_stats)):
+            text = td.get_text(strip=True)
+            if label == "Possession":
+                stats["Possession"] = text.replace('%', '')
+            elif label == "Passing Accuracy":
+                completed, total = parse_ratio(text)
+                if completed and total:
+                    stats["Passes Completed"] = completed
+                    stats["Total Passes"] = total
+            elif label == "Shots on Target":
+                on_target, total = parse_ratio(text)
+                if on_target and total:
+                    stats["Shots on Target"] = on_target
+                    stats["Total Shots"] = total
+            elif label == "Saves":
+                pct = parse_percent(text)
+                if pct:
+                    stats["Saves Percentage"] = pct
+            elif label == "Cards":
+                stats["Yellow Cards"] = len(td.find_all("span", class_="yellow_card"))
+                stats["Red Cards"] = len(td.find_all("span", class_="red_card"))
+
+
+def parse_report(html: str):
+    """
+    (home_stats, away_stats) from a match-report page, or None when the
+    team_stats_extra section is missing or empty.
+    """
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    strainer = SoupStrainer("div", id=["team_stats", "team_stats_extra"])
+    soup = BeautifulSoup(html, _parser(), parse_only=strainer)
+    extra = soup.find("div", id="team_stats_extra")
+    if not extra:
+        return None
+    home_stats, away_stats = {}, {}
+    if not _parse_extra(extra, home_stats, away_stats):
+        return None
+    team_stats = soup.find("div", id="team_stats")
+    if team_stats:
+        _parse_team_stats(team_stats, home_stats, away_stats)
+    return home_stats, away_stats
+
+
+def scrape_match_reports(csv_filename: str = REPORT_CSV, max_workers: int = MAX_WORKERS):
+    """Scrape every played match's report into one row per team; returns the DataFrame."""
+    import pandas as pd
+    from httpclient import conditional_get
+
+    schedule_html, _ = conditional_get(main_url, SCHEDULE_CACHE, headers=headers)
+    links = report_links(schedule_html)
+    print(f"{len(links)} match reports to read")
+
+    match_data = []
+    for link, (url, html, error) in zip(links, fetch_reports([l["url"] for l in links], max_workers)):
+        home_team, away_team, score = link["home"], link["away"], link["score"]
+        if error is not None:
+            print(f"⚠ Could not fetch {url}: {error}")
+            continue
+        stats = parse_report(html)
+        if stats is None:
+            print(f"⚠ Stats section missing for {home_team} vs {away_team}")
+            continue
+        home_stats, away_stats = stats
+        match_data.append({"Team": home_team, "Opponent": away_team, "Match Result": score,
+                           "Home/Away": "Home", **home_stats})
+        match_data.append({"Team": away_team, "Opponent": home_team, "Match Result": score,
+                           "Home/Away": "Away", **away_stats})
+
+    df = pd.DataFrame(match_data)
+    df.to_csv(csv_filename, index=False)
+    print(f"\n✅ {len(df)} rows saved to {csv_filename}")
+    return df
+
+
+if __name__ == "__main__":
+    scrape_match_reports()
@@ -1,15 +1,21 @@
-from curl_cffi import requests
 import csv
+import os
 from rich import print
-import random
-import time
-from statsperhalf import data_ids
-from matchdicts import all_match_dict
-from resultscraper import build_results_dict
+from concurrent.futures import ThreadPoolExecutor
+from httpclient import get_json
+from statscache import StatsCache
+from csvstream import StreamingCSVWriter
+from statschema import PERIODS, LONG_FIELDS
+from statextract import extract_periods, stats_to_columns
+from statsperhalf import get_data_ids
+from matchdicts import get_all_match_dict
+from resultscraper import RESULTS_CSV, scrape_results, season_of_timestamp
+from resultsjoin import ResultsIndex, load_results_table, rejoin_files
 
-# Load the results CSV into a dictionary. 
-# (Assumes build_results_dict returns keys as tuples (team, opponent) in lowercase.)
-results_dict = build_results_dict("statspermatch_simple.csv")
+# Fixtures, match ids and results are all loaded on first use, so importing
+# this module is cheap. Results are joined on (home, away, season) through
+# resultsjoin.ResultsIndex, with each match's season taken from its SofaScore
+# startTimestamp (kept in the stats cache index next to the payload).
 
 HEADERS = {
     "User-Agent": (
@@ -20,162 +26,284 @@ HEADERS = {
     "Accept-Language": "en-US,en;q=0.9"
 }
 
-def fetch_match_statistics(match_id: int):
-    url = f"https://www.sofascore.com/api/v1/event/{match_id}/statistics"
-    resp = requests.get(url, headers=HEADERS)
-    resp.raise_for_status()
-    return resp.json()
-
-def process_period(data: dict, period_label: str):
-    """Extract statistics for the given period."""
-    home_stats = {}
-    away_stats = {}
-    for period in data.get("statistics", []):
-        if period.get("period") == period_label:
-            for group in period.get("groups", []):
-                for item in group.get("statisticsItems", []):
-                    stat_name = item.get("name", "")
-                    home_stats[stat_name] = item.get("home", "")
-                    away_stats[stat_name] = item.get("away", "")
-    return home_stats, away_stats
-
-def add_results(rows):
-    match_counts = {}
-    unmatched = []
-    print("results_dict keys:", list(results_dict.keys()))
-    
-    for row in rows:
-        team = row["team"]
-        opponent = row["opponent"]
-        key_forward = (team, opponent)
-        key_reverse = (opponent, team)
-        
-        print(f"Trying: {key_forward}")
-        
-        if key_forward not in match_counts:
-            match_counts[key_forward] = 0
-        if key_reverse not in match_counts:
-            match_counts[key_reverse] = 0
-        
-        if key_forward in results_dict:
-            match_index = match_counts[key_forward]
-            if match_index < len(results_dict[key_forward]):
-                match_data = results_dict[key_forward][match_index]
-                row["RESULT"] = match_data["result"]
-                row["REFEREE"] = match_data["referee"]
-                match_counts[key_forward] += 1
-                print(f"Matched {key_forward}: {match_data}")
-            else:
-                row["RESULT"] = "N/A (No more matches)"
-                row["REFEREE"] = "N/A"
-                unmatched.append((team, opponent, row["match_id"], "forward"))
-        elif key_reverse in results_dict:
-            match_index = match_counts[key_reverse]
-            if match_index < len(results_dict[key_reverse]):
-                match_data = results_dict[key_reverse][match_index]
-                row["RESULT"] = match_data["result"]
-                row["REFEREE"] = match_data["referee"]
-                match_counts[key_reverse] += 1
-                print(f"Matched {key_reverse}: {match_data}")
-            else:
-                row["RESULT"] = "N/A (No more matches)"
-                row["REFEREE"] = "N/A"
-                unmatched.append((team, opponent, row["match_id"], "reverse"))
+SOFASCORE_API = "https://www.sofascore.com/api/v1"
+MAX_WORKERS = 8
+
+def fetch_match_statistics(match_id: int, base_url: str = SOFASCORE_API):
+    return get_json(f"{base_url}/event/{match_id}/statistics", headers=HEADERS)
+
+def fetch_match_event(match_id: int, base_url: str = SOFASCORE_API) -> dict:
+    """The /event/{id} summary (status, startTimestamp, ...)."""
+    return get_json(f"{base_url}/event/{match_id}", headers=HEADERS).get("event", {})
+
+def fetch_match(match_id: int, base_url: str = SOFASCORE_API):
+    """
+    (statistics, finished, startTimestamp). Statistics are final once
+    SofaScore reports the event as finished.
+    """
+    event = fetch_match_event(match_id, base_url)
+    finished = event.get("status", {}).get("type") == "finished"
+    return fetch_match_statistics(match_id, base_url), finished, event.get("startTimestamp")
+
+def fetch_all_statistics(match_ids, max_workers: int = MAX_WORKERS, base_url: str = SOFASCORE_API):
+    """
+    Fetch statistics for every match with at most max_workers matches in flight.
+    Yields (match_id, data, final, start, error) in the same order as match_ids, so the
+    caller can process results while later matches are still downloading.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(fetch_match, match_id, base_url) for match_id in match_ids]
+        for match_id, future in zip(match_ids, futures):
+            try:
+                data, final, start = future.result()
+                yield match_id, data, final, start, None
+            except Exception as e:
+                yield match_id, None, False, None, e
+
+def load_statistics(match_ids, cache: StatsCache, offline: bool = False,
+                    max_workers: int = MAX_WORKERS, base_url: str = SOFASCORE_API):
+    """
+    Yield (match_id, data, start, error) in match_ids order, serving finished
+    matches from the cache and fetching only IDs that are missing, not yet
+    final, or cached before kick-off times were recorded. Every fetched
+    payload is cached as soon as it arrives. With offline=True nothing is
+    fetched and uncached matches are reported as errors.
+    """
+    to_fetch = [] if offline else [mid for mid in match_ids
+                                   if not cache.is_final(mid) or cache.start_timestamp(mid) is None]
+    fetched = fetch_all_statistics(to_fetch, max_workers, base_url)
+    pending = set(to_fetch)
+    if to_fetch:
+        print(f"{len(match_ids) - len(to_fetch)} matches cached, fetching {len(to_fetch)}.")
+
+    for match_id in match_ids:
+        if match_id not in pending:
+            data = cache.get(match_id)
+            yield (match_id, data, cache.start_timestamp(match_id),
+                   None if data is not None else LookupError("not in cache"))
+            continue
+
+        _, data, final, start, error = next(fetched)
+        if error is None:
+            cache.put(match_id, data, final, start)
+            yield match_id, data, start, None
+        elif match_id in cache:
+            print(f"Error fetching match {match_id}, using cached copy: {error}")
+            yield match_id, cache.get(match_id), cache.start_timestamp(match_id), None
         else:
-            row["RESULT"] = "N/A (Not found)"
-            row["REFEREE"] = "N/A"
-            unmatched.append((team, opponent, row["match_id"], "not found"))
-    
-    if unmatched:
-        print(f"Warning: {len(unmatched)} matches not matched:")
-        for team, opp, mid, reason in unmatched[:5]:
-            print(f"  - {team} vs {opp} (match_id: {mid}, reason: {reason})")
-            
-            
-def write_csv(filename, rows):
-    if not rows:
-        print(f"No data for {filename}. Skipping CSV creation.")
+            yield match_id, None, None, error
+
+def read_csv(filename):
+    """Yield rows of an existing CSV one at a time (nothing if it does not exist)."""
+    try:
+        f = open(filename, "r", newline="", encoding="utf-8")
+    except FileNotFoundError:
         return
-    keys = set()
-    for row in rows:
-        keys.update(row.keys())
-    # Ensure these columns appear first.
-    priority_cols = ["match_number", "match_id", "team", "opponent", "RESULT"]
-    ordered_keys = priority_cols + sorted(k for k in keys if k not in priority_cols)
-    
-    with open(filename, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=ordered_keys)
-        writer.writeheader()
-        writer.writerows(rows)
-    print(f"CSV file '{filename}' created successfully.")
-
-def main():
-    stats_all = []
-    stats_1st = []
-    stats_2nd = []
-    periods = ["ALL", "1ST", "2ND"]
-    match_counter = 0
+    with f:
+        yield from csv.DictReader(f)
 
-    for match_id in data_ids:
-        match_counter += 1
-        print(f"Processing match {match_counter} (ID {match_id})...")
-        try:
-            data = fetch_match_statistics(match_id)
-        except Exception as e:
-            print(f"Error fetching match {match_id}: {e}")
+OUTPUT_FILES = {"ALL": "matches_ALL.csv", "1ST": "matches_1ST.csv", "2ND": "matches_2ND.csv"}
+LONG_FILE = "matches_LONG.csv"
+
+def read_existing(long_format: bool) -> tuple[set, int]:
+    """
+    (match ids, highest match_number) already in the full-match rows, streamed
+    one row at a time from matches_ALL.csv or the "ALL" rows of the long CSV.
+    """
+    known_ids, last_number = set(), 0
+    for row in read_csv(LONG_FILE if long_format else OUTPUT_FILES["ALL"]):
+        if long_format and row["period"] != "ALL":
             continue
+        known_ids.add(row["match_id"])
+        last_number = max(last_number, int(row["match_number"]))
+    return known_ids, last_number
 
-        # Retrieve canonical team names from all_match_dict.
-        mid_str = str(match_id)
-        if mid_str in all_match_dict:
-            actual_home = all_match_dict[mid_str]["home"]
-            actual_away = all_match_dict[mid_str]["away"]
-        else:
-            actual_home = "unknown-home"
-            actual_away = "unknown-away"
+def fetch_start_timestamp(match_id, base_url: str = SOFASCORE_API):
+    try:
+        return fetch_match_event(match_id, base_url).get("startTimestamp")
+    except Exception as e:
+        print(f"Error fetching the kick-off time of match {match_id}: {e}")
+        return None
+
+def backfill_existing(paths: list[str], cache: StatsCache, all_match_dict: dict, offline: bool = False,
+                      max_workers: int = MAX_WORKERS, base_url: str = SOFASCORE_API) -> int:
+    """
+    Fill the blank season and opponent cells of rows written before those
+    columns existed. Seasons come from the kick-off times in the stats cache;
+    missing times are fetched once and recorded, unless offline. Opponents
+    come from the fixture list. Returns the number of rows changed.
+    """
+    import numpy as np
+    import pandas as pd
+
+    frames = {path: pd.read_csv(path, dtype=str, keep_default_na=False) for path in paths if os.path.exists(path)}
+    blank = set()
+    for frame in frames.values():
+        blank |= set(frame.loc[frame["season"] == "", "match_id"])
+    starts = {mid: cache.start_timestamp(mid) for mid in blank}
+    missing = [mid for mid, start in starts.items() if start is None]
+    if missing and not offline:
+        print(f"Fetching kick-off times for {len(missing)} matches written without a season.")
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for mid, start in zip(missing, pool.map(lambda mid: fetch_start_timestamp(mid, base_url), missing)):
+                starts[mid] = start
+                if start is not None and mid in cache:
+                    cache.put(mid, cache.get(mid), cache.is_final(mid), start)
+    seasons = {mid: season_of_timestamp(start) for mid, start in starts.items()}
 
-        for period in periods:
-            home_stats, away_stats = process_period(data, period)
-            if not (home_stats or away_stats):
-                print(f"No data for period '{period}' in match {match_id}.")
+    changed = 0
+    for path, frame in frames.items():
+        fixture = frame["match_id"].map(all_match_dict)
+        known = fixture.notna().to_numpy()
+        home = np.array([f["home"] if isinstance(f, dict) else "" for f in fixture])
+        away = np.array([f["away"] if isinstance(f, dict) else "" for f in fixture])
+        opponent = np.where(frame["team"].to_numpy() == home, away, home)
+        season = frame["match_id"].map(seasons).fillna("").to_numpy()
+        fill_season = (frame["season"] == "").to_numpy() & (season != "")
+        fill_opponent = (frame["opponent"] == "").to_numpy() & known
+        if not (fill_season.any() or fill_opponent.any()):
+            continue
+        frame["season"] = np.where(fill_season, season, frame["season"])
+        frame["opponent"] = np.where(fill_opponent, opponent, frame["opponent"])
+        frame.to_csv(path, index=False, lineterminator="\r\n")
+        changed += int((fill_season | fill_opponent).sum())
+    return changed
+
+def main(max_workers: int = MAX_WORKERS, base_url: str = SOFASCORE_API, offline: bool = False,
+         incremental: bool = False, long_format: bool = False):
+    """
+    Build the per-period match CSVs. With long_format=True every period goes
+    into the single matches_LONG.csv (a leading period column) instead.
+    """
+    cache = StatsCache()
+    periods = PERIODS
+    match_counter = 0
+    data_ids = list(get_data_ids())
+    all_match_dict = get_all_match_dict()
+    match_ids = data_ids
+    # A live run revalidates the FBref results; an offline run only reads the
+    # saved CSV and never touches the network, even when the CSV is missing.
+    if not offline:
+        scrape_results(RESULTS_CSV)
+    if os.path.exists(RESULTS_CSV):
+        results = ResultsIndex(load_results_table(RESULTS_CSV))
+    else:
+        print(f"Warning: '{RESULTS_CSV}' not found, so matches are written without results.")
+        results = ResultsIndex()
+    print(f"{len(results.table)} results loaded.")
+
+    if incremental:
+        # Only matches missing from the full-match rows are fetched; numbering carries on.
+        known_ids, match_counter = read_existing(long_format)
+        match_ids = [mid for mid in data_ids if str(mid) not in known_ids]
+        source = LONG_FILE if long_format else OUTPUT_FILES["ALL"]
+        print(f"{len(known_ids)} matches already in {source}, {len(match_ids)} new.")
+
+    if long_format:
+        long_writer = StreamingCSVWriter(LONG_FILE, LONG_FIELDS, append=incremental)
+        writers = dict.fromkeys(periods, long_writer)
+    else:
+        writers = {period: StreamingCSVWriter(OUTPUT_FILES[period], append=incremental) for period in periods}
+    try:
+        for match_id, data, start, error in load_statistics(match_ids, cache, offline, max_workers, base_url):
+            match_counter += 1
+            print(f"Processing match {match_counter} (ID {match_id})...")
+            if error is not None:
+                print(f"Error fetching match {match_id}: {error}")
                 continue
 
-            # Build two rows: one for the home side and one for the away side.
-            row_home = {
-                "match_number": match_counter,
-                "match_id": match_id,
-                "team": actual_home,
-                "opponent": actual_away
-            }
-            row_home.update(home_stats)
-
-            row_away = {
-                "match_number": match_counter,
-                "match_id": match_id,
-                "team": actual_away,
-                "opponent": actual_home
-            }
-            row_away.update(away_stats)
-
-            if period == "ALL":
-                stats_all.extend([row_home, row_away])
-            elif period == "1ST":
-                stats_1st.extend([row_home, row_away])
-            elif period == "2ND":
-                stats_2nd.extend([row_home, row_away])
-        
-        '''sleep_time = random.uniform(2, 4)
-        print(f"Sleeping for {sleep_time:.2f} seconds...")
-        time.sleep(sleep_time)'''
-    
-    # Merge results (final score) into each row using the canonical ordering.
-    add_results(stats_all)
-    add_results(stats_1st)
-    add_results(stats_2nd)  # Note: careful with variable names (2ND vs. 2nd)
-
-    write_csv("matches_ALL.csv", stats_all)
-    write_csv("matches_1ST.csv", stats_1st)
-    write_csv("matches_2ND.csv", stats_2nd)
+            # Retrieve canonical team names from all_match_dict.
+            mid_str = str(match_id)
+            if mid_str in all_match_dict:
+                actual_home = all_match_dict[mid_str]["home"]
+                actual_away = all_match_dict[mid_str]["away"]
+            else:
+                actual_home = "unknown-home"
+                actual_away = "unknown-away"
+
+            # One results lookup per match covers every period's rows.
+            season = season_of_timestamp(start)
+            result, referee = results.lookup(match_id, actual_home, actual_away, season)
+
+            # One pass over the payload splits out every period.
+            extracted = extract_periods(data)
+            for period in periods:
+                if period not in extracted:
+                    print(f"No data for period '{period}' in match {match_id}.")
+                    continue
+                home_values, away_values, extras = extracted[period]
+
+                # Build two rows: one for the home side and one for the away side.
+                row_home = {
+                    "match_number": match_counter,
+                    "match_id": match_id,
+                    "season": season,
+                    "team": actual_home,
+                    "opponent": actual_away,
+                    "RESULT": result,
+                    "REFEREE": referee
+                }
+                row_home.update(stats_to_columns(home_values, extras, 0))
+
+                row_away = {
+                    "match_number": match_counter,
+                    "match_id": match_id,
+                    "season": season,
+                    "team": actual_away,
+                    "opponent": actual_home,
+                    "RESULT": result,
+                    "REFEREE": referee
+                }
+                row_away.update(stats_to_columns(away_values, extras, 1))
+
+                # Write straight out.
+                rows = [row_home, row_away]
+                if long_format:
+                    for row in rows:
+                        row["period"] = period
+                writers[period].write_rows(rows)
+    finally:
+        for writer in set(writers.values()):
+            writer.close()
+
+    if incremental:
+        # Rows from earlier runs may predate the season/opponent columns or
+        # have been written before their result was known: fill them in and
+        # re-join every row, which also rewrites the unmatched report.
+        paths = [LONG_FILE] if long_format else list(OUTPUT_FILES.values())
+        filled = backfill_existing(paths, cache, all_match_dict, offline, max_workers, base_url)
+        if filled:
+            print(f"Filled season/opponent on {filled} existing rows.")
+        if os.path.exists(RESULTS_CSV):
+            rejoin_files(paths, RESULTS_CSV)
+        else:
+            results.write_unmatched()
+    else:
+        results.write_unmatched()
+    for period in periods:
+        if not long_format:
+            print(f"{writers[period].rows_written} rows written to '{OUTPUT_FILES[period]}'.")
+    if long_format:
+        print(f"{long_writer.rows_written} rows written to '{LONG_FILE}'.")
+
+    # Typed numeric copies for analysis, parsed once here rather than by every consumer.
+    from statnormalizer import normalize_file
+    for filename in [LONG_FILE] if long_format else OUTPUT_FILES.values():
+        print(f"Typed stats written to '{normalize_file(filename)}'.")
+
+    # Elo / xG ratings: only the matches just written are applied to the saved state.
+    from ratings import update_ratings
+    update_ratings(long_csv=LONG_FILE if long_format else None, files=OUTPUT_FILES)
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="Build matches_*.csv from SofaScore statistics.")
+    parser.add_argument("--offline", action="store_true", help="rebuild the CSVs from the cache only")
+    parser.add_argument("--incremental", action="store_true",
+                        help="fetch only matches missing from the CSVs and append them, then re-join every row")
+    parser.add_argument("--long", action="store_true",
+                        help=f"write every period to {LONG_FILE} instead of three CSVs")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    args = parser.parse_args()
+    main(max_workers=args.workers, offline=args.offline, incremental=args.incremental,
+         long_format=args.long)
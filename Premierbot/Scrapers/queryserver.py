@@ -0,0 +1,199 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from statschema import PERIODS
+from teamregistry import team_id
+from headtohead import (PERIOD_LABELS, load_datasets, deduplicate_matches, MatchStore,
+                        find_last_head_to_head_group, calculate_averages_dedup, get_form, get_decayed_form)
+
+# ------------------------
+# Local JSON query service over the head-to-head indexes
+# ------------------------
+# Keeps one MatchStore per period in memory, with the stat matrix and form
+# tracker already built. Each request is a dictionary lookup, not a cold
+# CSV parse. The match CSVs are re-stat'ed at most once per CHECK_INTERVAL
+# and the indexes are rebuilt when any of them changes. Requests keep
+# answering from the old indexes while the new ones are built.
+#
+#   GET /h2h?team1=man-utd&team2=chelsea[&period=ALL]
+#   GET /last?team=arsenal[&n=5][&period=1ST]
+#   GET /averages?team=arsenal[&period=2ND]
+#   GET /form?team=arsenal[&windows=3,5,10][&half_life=5]
+#   GET /status
+#
+# period is ALL/1ST/2ND (or the report label); without it every period is
+# returned, keyed by label.
+
+CHECK_INTERVAL = 1.0
+DEFAULT_FILES = {"ALL": "matches_ALL.csv", "1ST": "matches_1ST.csv", "2ND": "matches_2ND.csv",
+                 "LONG": "matches_LONG.csv"}
+
+
+class QueryError(Exception):
+    """Bad request parameters; reported to the client as a 400."""
+
+
+class MatchData:
+    """Per-period stores, reloaded when the source CSVs change."""
+
+    def __init__(self, files: dict = DEFAULT_FILES, check_interval: float = CHECK_INTERVAL):
+        self.files = files
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.signature = None
+        self.stores = {}
+        self.loaded_at = 0.0
+        self.last_check = 0.0
+        self.reload()
+
+    def _signature(self) -> tuple:
+        signature = []
+        for path in self.files.values():
+            try:
+                stat = os.stat(path)
+                signature.append((path, stat.st_size, stat.st_mtime_ns))
+            except FileNotFoundError:
+                signature.append((path, None, None))
+        return tuple(signature)
+
+    def reload(self):
+        signature = self._signature()
+        datasets = load_datasets(self.files["ALL"], self.files["1ST"], self.files["2ND"], self.files.get("LONG"))
+        stores = {}
+        for period, rows in datasets.items():
+            store = MatchStore(deduplicate_matches(rows))
+            store.matrix, store.form  # build both now rather than on the first request
+            stores[period] = store
+        self.stores, self.signature, self.loaded_at = stores, signature, time.time()
+        print(f"Loaded {', '.join(f'{p}: {len(s.dedup_matches)} matches' for p, s in stores.items())}")
+
+    def current(self) -> dict:
+        """{period label: MatchStore}, reloading first if a CSV changed since the last check."""
+        now = time.monotonic()
+        if now - self.last_check >= self.check_interval and self.lock.acquire(blocking=False):
+            try:
+                self.last_check = now
+                if self._signature() != self.signature:
+                    self.reload()
+            except Exception as e:
+                print(f"Reload failed, still serving the previous data: {e}")
+            finally:
+                self.lock.release()
+        return self.stores
+
+
+def _param(params: dict, name: str, default=None) -> str:
+    values = params.get(name)
+    if values:
+        return values[0]
+    if default is None:
+        raise QueryError(f"missing parameter '{name}'")
+    return default
+
+
+def _select(stores: dict, params: dict) -> dict:
+    """Stores for the requested period (all of them when none is given)."""
+    period = params.get("period", [None])[0]
+    if period is None:
+        return stores
+    label = PERIOD_LABELS.get(period.upper(), period)
+    if label not in stores:
+        raise QueryError(f"unknown period '{period}', expected one of {PERIODS}")
+    return {label: stores[label]}
+
+
+def query_h2h(stores: dict, params: dict) -> dict:
+    team1, team2 = _param(params, "team1"), _param(params, "team2")
+    return {period: find_last_head_to_head_group(store, team1, team2) or None
+            for period, store in _select(stores, params).items()}
+
+
+def query_last(stores: dict, params: dict) -> dict:
+    team = team_id(_param(params, "team"))
+    n = int(_param(params, "n", "5"))
+    return {period: store.last_n(team, n) for period, store in _select(stores, params).items()}
+
+
+def query_averages(stores: dict, params: dict) -> dict:
+    team = _param(params, "team")
+    return {period: calculate_averages_dedup(store, team) for period, store in _select(stores, params).items()}
+
+
+def query_form(stores: dict, params: dict) -> dict:
+    team = _param(params, "team")
+    windows = [int(n) for n in _param(params, "windows", "3,5,10").split(",")]
+    half_life = float(_param(params, "half_life", "5"))
+    if not half_life > 0:
+        raise QueryError(f"half_life must be a positive number of matches, got {half_life}")
+    selected = _select(stores, params)
+    return {period: {"matches": store.form.matches(team_id(team)),
+                     "rolling": get_form(store, team, windows),
+                     "decayed": get_decayed_form(store, team, half_life)}
+            for period, store in selected.items()}
+
+
+ROUTES = {
+    "/h2h": query_h2h,
+    "/last": query_last,
+    "/averages": query_averages,
+    "/form": query_form,
+}
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    data = None  # MatchData, set by make_server
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/status":
+            self._send(200, {"files": list(self.data.files.values()), "loaded_at": self.data.loaded_at,
+                             "matches": {p: len(s.dedup_matches) for p, s in self.data.current().items()}})
+            return
+        route = ROUTES.get(url.path)
+        if route is None:
+            self._send(404, {"error": f"unknown endpoint '{url.path}'", "endpoints": sorted(ROUTES)})
+            return
+        try:
+            self._send(200, route(self.data.current(), parse_qs(url.query)))
+        except (QueryError, ValueError) as e:
+            self._send(400, {"error": str(e)})
+        except Exception as e:
+            print(f"Error serving {self.path}: {e!r}")
+            self._send(500, {"error": "internal error"})
+
+    def _send(self, status: int, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8765, files: dict = DEFAULT_FILES) -> ThreadingHTTPServer:
+    handler = type("BoundQueryHandler", (QueryHandler,), {"data": MatchData(files)})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Serve head-to-head queries as JSON from in-memory indexes.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--data-dir", default=".", help="folder holding matches_*.csv")
+    args = parser.parse_args()
+    files = {period: os.path.join(args.data_dir, name) for period, name in DEFAULT_FILES.items()}
+    server = make_server(args.host, args.port, files)
+    print(f"Serving on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
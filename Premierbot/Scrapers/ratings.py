@@ -0,0 +1,317 @@
+import argparse
+import json
+import os
+import numpy as np
+import pandas as pd
+from fixtureindex import fixture_index
+from seasonsim import load_played
+from teamregistry import normalize_team_name
+
+# ------------------------
+# Incremental Elo / xG ratings
+# ------------------------
+# Every team carries one rating per series:
+#   ALL elo : classic Elo on the full-time result, scaled by goal margin
+#   ALL xg  : Elo where the "result" is the xG share, xg_for / (xg_for + xg_against)
+#   1ST xg, 2ND xg : the same per half (the half CSVs carry the full-time
+#                    RESULT, so only their xG says anything about the half)
+# One match moves each series by K * margin * (score - expected) for the
+# home side and the opposite for the away side, an O(1) update. A match with
+# no parsed result still moves the xG series; only its elo is left alone. After each
+# update the ratings are copied into that (season, matchday) snapshot, so
+# rating(..., round_number=N, season=S) answers "as of matchday N of S" without
+# replaying anything. Matches are ordered by season (each match's own, from
+# its start time) first, then matchday, then SofaScore match id.
+#
+# The state (ratings, snapshots, match ids seen) lives in RATINGS_STATE.
+# update_ratings() applies only matches it has not seen. A match that sorts
+# before the latest one already applied forces a full replay, and so does a
+# seen match whose result has arrived since (its elo was left alone). The replay is
+# vectorized: consecutive matches with no team in common commute, so each such
+# run is applied to every series at once with fancy indexing. The result
+# equals the match-by-match order exactly.
+
+RATINGS_STATE = "ratings.json"
+STATE_VERSION = 3
+INITIAL_RATING = 1500.0
+K_FACTOR = 20.0
+HOME_ADVANTAGE = 60.0
+PERIOD_FILES = {"ALL": "matches_ALL.csv", "1ST": "matches_1ST.csv", "2ND": "matches_2ND.csv"}
+LONG_CSV = "matches_LONG.csv"
+SERIES = [("ALL", "elo"), ("ALL", "xg"), ("1ST", "xg"), ("2ND", "xg")]
+RESULT_PERIODS = {period for period, kind in SERIES if kind == "elo"}
+EVENT_FIELDS = ["period", "match_id", "season", "round", "home", "away", "goals_home", "goals_away", "xg_home", "xg_away"]
+
+
+def match_score(kind: str, goals_home, goals_away, xg_home, xg_away):
+    """
+    (home score in [0, 1], K multiplier) for a series kind; works on scalars or
+    arrays. The score is NaN when the match has nothing to rate for that kind
+    (no parsed result for elo, no xG for xg).
+    """
+    if kind == "elo":
+        margin = np.abs(np.asarray(goals_home, float) - goals_away)
+        score = np.where(goals_home > goals_away, 1.0, np.where(goals_home == goals_away, 0.5, 0.0))
+        multiplier = np.where(margin <= 1, 1.0, np.where(margin == 2, 1.5, (11 + margin) / 8))
+        return np.where(np.isnan(margin), np.nan, score), multiplier
+    total = np.asarray(xg_home, float) + xg_away
+    score = np.divide(xg_home, total, out=np.full(np.shape(total), 0.5), where=total > 0)
+    return np.where(np.isnan(total), np.nan, score), np.ones(np.shape(total))
+
+
+def expected_score(home_rating, away_rating, home_advantage: float = HOME_ADVANTAGE):
+    return 1.0 / (1.0 + 10.0 ** ((away_rating - home_rating - home_advantage) / 400.0))
+
+
+def _order_key(match_id: str, season: str, round_number) -> list:
+    """Chronological sort key: season, matchday, then SofaScore match id; unindexed matches last in their season."""
+    return [season, round_number is None, round_number or 0, int(match_id)]
+
+
+class RatingEngine:
+    """Ratings, per-matchday snapshots and seen match ids (see module comment)."""
+
+    def __init__(self, k_factor: float = K_FACTOR, home_advantage: float = HOME_ADVANTAGE):
+        self.k_factor = k_factor
+        self.home_advantage = home_advantage
+        self.teams = []
+        self.index = {}
+        self.ratings = np.empty((0, len(SERIES)))
+        self.snapshots = {}
+        self.seen = {period: set() for period in PERIOD_FILES}
+        self.no_result = {period: set() for period in PERIOD_FILES}
+        self.last_key = {period: None for period in PERIOD_FILES}
+        self.columns = {period: [i for i, (p, _) in enumerate(SERIES) if p == period] for period in PERIOD_FILES}
+
+    def _team(self, name: str) -> int:
+        slug = normalize_team_name(name)
+        if slug not in self.index:
+            self.index[slug] = len(self.teams)
+            self.teams.append(slug)
+            self.ratings = np.vstack([self.ratings, np.full((1, len(SERIES)), INITIAL_RATING)])
+        return self.index[slug]
+
+    def in_order(self, period: str, match_id: str, season: str, round_number) -> bool:
+        """True when the match sorts after everything already applied for its period."""
+        last = self.last_key[period]
+        return last is None or _order_key(match_id, season, round_number) > last
+
+    def _apply(self, period: str, home: np.ndarray, away: np.ndarray, goals_home, goals_away, xg_home, xg_away):
+        """Update every series of a period for matches whose teams are all distinct."""
+        for column in self.columns[period]:
+            score, multiplier = match_score(SERIES[column][1], goals_home, goals_away, xg_home, xg_away)
+            expected = expected_score(self.ratings[home, column], self.ratings[away, column], self.home_advantage)
+            delta = np.where(np.isnan(score), 0.0, self.k_factor * multiplier * (score - expected))
+            self.ratings[home, column] += delta
+            self.ratings[away, column] -= delta
+
+    def _mark(self, period: str, match_id: str, season: str, round_number, has_result: bool):
+        self.seen[period].add(match_id)
+        if not has_result and period in RESULT_PERIODS:
+            self.no_result[period].add(match_id)
+        self.last_key[period] = max(self.last_key[period] or [], _order_key(match_id, season, round_number))
+
+    def update(self, period: str, match_id: str, season: str, round_number, home: str, away: str,
+               goals_home: float, goals_away: float, xg_home: float, xg_away: float):
+        """Apply one match in O(1). The caller checks in_order() first."""
+        if match_id in self.seen[period]:
+            return
+        h, a = self._team(home), self._team(away)
+        self._apply(period, np.array([h]), np.array([a]), np.array([goals_home]), np.array([goals_away]),
+                    np.array([xg_home]), np.array([xg_away]))
+        self._mark(period, match_id, season, round_number, not np.isnan([goals_home, goals_away]).any())
+        if round_number is not None:
+            self.snapshots[(season, round_number)] = self.ratings.copy()
+
+    def replay(self, events: pd.DataFrame):
+        """Reset and apply every event in chronological order, a conflict-free run at a time."""
+        self.__init__(self.k_factor, self.home_advantage)
+        events = sort_events(events)
+        home = np.array([self._team(t) for t in events["home"]], dtype=np.int64)
+        away = np.array([self._team(t) for t in events["away"]], dtype=np.int64)
+        values = events[["goals_home", "goals_away", "xg_home", "xg_away"]].to_numpy(float)
+        periods, seasons = events["period"].to_numpy(), events["season"].tolist()
+        keys = list(zip(seasons, events["round"].tolist()))
+
+        def flush(rows):
+            for period in PERIOD_FILES:
+                batch = [i for i in rows if periods[i] == period]
+                if batch:
+                    self._apply(period, home[batch], away[batch], *values[batch].T)
+
+        run, busy = [], set()
+        for i, period in enumerate(periods):
+            teams = {(period, home[i]), (period, away[i])}
+            if run and (busy & teams or keys[i] != keys[run[0]]):
+                flush(run)
+                if keys[i] != keys[run[0]] and keys[run[0]][1] is not None:
+                    self.snapshots[keys[run[0]]] = self.ratings.copy()
+                run, busy = [], set()
+            run.append(i)
+            busy |= teams
+        if run:
+            flush(run)
+            if keys[run[0]][1] is not None:
+                self.snapshots[keys[run[0]]] = self.ratings.copy()
+        has_result = ~np.isnan(values[:, :2]).any(axis=1)
+        for period, match_id, (season, round_number), result in zip(periods, events["match_id"], keys, has_result):
+            self._mark(period, match_id, season, round_number, result)
+
+    def latest_season(self) -> str:
+        """Latest season with a matchday snapshot ('' when there is none)."""
+        return max((season for season, _ in self.snapshots), default="")
+
+    def rating(self, team: str, period: str = "ALL", kind: str = "elo", round_number: int = None,
+               season: str = None) -> float:
+        """
+        Current rating, or the rating after matchday round_number of season
+        (the latest season by default): the last snapshot at or before it.
+        """
+        column = SERIES.index((period, kind))
+        row = self.index.get(normalize_team_name(team))
+        if row is None:
+            return INITIAL_RATING
+        if round_number is None:
+            return float(self.ratings[row, column])
+        as_of = (self.latest_season() if season is None else season, round_number)
+        earlier = [key for key in self.snapshots if key <= as_of]
+        if not earlier:
+            return INITIAL_RATING
+        snapshot = self.snapshots[max(earlier)]
+        return float(snapshot[row, column]) if row < len(snapshot) else INITIAL_RATING
+
+    def table(self, period: str = "ALL", kind: str = "elo") -> list[tuple[str, float]]:
+        column = SERIES.index((period, kind))
+        return sorted(zip(self.teams, self.ratings[:, column].tolist()), key=lambda item: -item[1])
+
+    def preview(self, home: str, away: str, round_number: int = None, season: str = None) -> dict:
+        """Per series: both ratings and the home side's expected score."""
+        preview = {}
+        for period, kind in SERIES:
+            home_rating = self.rating(home, period, kind, round_number, season)
+            away_rating = self.rating(away, period, kind, round_number, season)
+            preview[f"{period} {kind}"] = {
+                "home": home_rating, "away": away_rating,
+                "home_expected": float(expected_score(home_rating, away_rating, self.home_advantage)),
+            }
+        return preview
+
+    def to_state(self) -> dict:
+        return {
+            "version": STATE_VERSION,
+            "k_factor": self.k_factor,
+            "home_advantage": self.home_advantage,
+            "series": [f"{period} {kind}" for period, kind in SERIES],
+            "teams": self.teams,
+            "ratings": self.ratings.tolist(),
+            "snapshots": [[season, r, snapshot.tolist()] for (season, r), snapshot in sorted(self.snapshots.items())],
+            "seen": {period: sorted(ids, key=int) for period, ids in self.seen.items()},
+            "no_result": {period: sorted(ids, key=int) for period, ids in self.no_result.items()},
+            "last_key": self.last_key,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "RatingEngine":
+        engine = cls(state["k_factor"], state["home_advantage"])
+        engine.teams = state["teams"]
+        engine.index = {team: i for i, team in enumerate(engine.teams)}
+        engine.ratings = np.array(state["ratings"], dtype=float).reshape(len(engine.teams), len(SERIES))
+        engine.snapshots = {(season, int(r)): np.array(s, dtype=float).reshape(-1, len(SERIES))
+                            for season, r, s in state["snapshots"]}
+        engine.seen = {period: set(ids) for period, ids in state["seen"].items()}
+        engine.no_result = {period: set(ids) for period, ids in state["no_result"].items()}
+        engine.last_key = state["last_key"]
+        return engine
+
+
+def sort_events(events: pd.DataFrame) -> pd.DataFrame:
+    keys = [_order_key(m, s, r) for m, s, r in zip(events["match_id"], events["season"], events["round"])]
+    order = sorted(range(len(keys)), key=lambda i: keys[i])
+    return events.iloc[order].reset_index(drop=True)
+
+
+def load_events(long_csv: str = LONG_CSV, files: dict = None) -> pd.DataFrame:
+    """Every match of every period (EVENT_FIELDS), from long_csv if it exists, else the per-period files."""
+    files = PERIOD_FILES if files is None else files
+    frames = []
+    for period, csv_path in files.items():
+        if long_csv and os.path.exists(long_csv):
+            played = load_played(long_csv, period, with_result=False)
+        elif os.path.exists(csv_path):
+            played = load_played(csv_path, with_result=False)
+        else:
+            continue
+        frames.append(played.assign(period=period))
+    if not frames:
+        return pd.DataFrame(columns=EVENT_FIELDS)
+    events = pd.concat(frames, ignore_index=True)
+    events["season"] = events["season"].astype(str)
+    rounds = {match_id: fixture.round for match_id, fixture in fixture_index().items()}
+    events["round"] = pd.Series([rounds.get(match_id) for match_id in events["match_id"]], dtype=object)
+    return events[EVENT_FIELDS]
+
+
+def load_engine(state_path: str = RATINGS_STATE) -> RatingEngine:
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") == STATE_VERSION:
+            return RatingEngine.from_state(state)
+    except (OSError, ValueError, KeyError):
+        pass
+    return RatingEngine()
+
+
+def save_engine(engine: RatingEngine, state_path: str = RATINGS_STATE):
+    with open(f"{state_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(engine.to_state(), f)
+    os.replace(f"{state_path}.tmp", state_path)
+
+
+def update_ratings(state_path: str = RATINGS_STATE, long_csv: str = LONG_CSV, files: dict = None,
+                   rebuild: bool = False) -> RatingEngine:
+    """
+    Bring the saved ratings up to date with the match CSVs: new matches are
+    applied one by one, or everything is replayed when one arrives out of order
+    or a match rated without a result now has one.
+    """
+    engine = RatingEngine() if rebuild else load_engine(state_path)
+    events = load_events(long_csv, files)
+    if events.empty:
+        print("No matches to rate yet.")
+        return engine
+    unseen = pd.Series([match_id not in engine.seen[period]
+                        for period, match_id in zip(events["period"], events["match_id"])], index=events.index)
+    new = sort_events(events.loc[unseen])
+    resolved = any(match_id in engine.no_result[period] for period, match_id, goals_home, goals_away
+                   in zip(events["period"], events["match_id"], events["goals_home"], events["goals_away"])
+                   if not (np.isnan(goals_home) or np.isnan(goals_away)))
+    if rebuild or resolved or not all(engine.in_order(*key)
+                                      for key in zip(new["period"], new["match_id"], new["season"], new["round"])):
+        engine.replay(events)
+        print(f"Ratings replayed over {len(events)} period matches.")
+    else:
+        for event in new.itertuples(index=False):
+            engine.update(event.period, event.match_id, event.season, event.round, event.home, event.away,
+                          event.goals_home, event.goals_away, event.xg_home, event.xg_away)
+        print(f"Ratings updated with {len(new)} new period matches.")
+    save_engine(engine, state_path)
+    return engine
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update Elo / xG ratings from the match CSVs.")
+    parser.add_argument("--rebuild", action="store_true", help="replay every match instead of applying new ones")
+    parser.add_argument("--state", default=RATINGS_STATE, help="ratings state file")
+    parser.add_argument("--preview", nargs=2, metavar=("HOME", "AWAY"), help="show ratings for one fixture")
+    parser.add_argument("--round", type=int, help="use the ratings as of this matchday for --preview")
+    parser.add_argument("--season", help="season of --round, e.g. 2024-2025 (default: the latest)")
+    args = parser.parse_args()
+
+    engine = update_ratings(args.state, rebuild=args.rebuild)
+    if args.preview:
+        for series, values in engine.preview(*args.preview, args.round, args.season).items():
+            print(f"{series:8} {values['home']:7.1f} {values['away']:7.1f}  home expected {values['home_expected']:.3f}")
+    else:
+        for team, rating in engine.table():
+            print(f"{team:16} {rating:7.1f}")
@@ -1,10 +1,8 @@
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-import time
-import random
 import csv
-from matchdicts import team_name_mapping, mapping
+import os
+from datetime import datetime, timezone
+from functools import lru_cache
+from teamregistry import normalize_team_name
 
 
 base_url = "https://fbref.com"
@@ -14,59 +12,99 @@ headers = {
                    "AppleWebKit/537.36 (KHTML, like Gecko) "
                    "Chrome/88.0.4324.150 Safari/537.36")
 }
+RESULTS_CSV = "statspermatch_simple.csv"
+SCHEDULE_CACHE = os.path.join("fbrefcache", "schedule.html")
 
-# Fetch the main schedule page
-response = requests.get(main_url, headers=headers)
-soup = BeautifulSoup(response.text, "html.parser")
-
-# Find all table rows
-matches = soup.find_all("tr")
-match_data = []
-
-for match in matches:
-    # Skip spacer or header rows
-    row_classes = match.get("class", [])
-    if "spacer" in row_classes or "partial_table_header" in row_classes:
-        continue
-
-    home_team_el = match.find("td", {"data-stat": "home_team"})
-    away_team_el = match.find("td", {"data-stat": "away_team"})
-    score_el = match.find("td", {"data-stat": "score"})
-    ref = match.find("td", {"data-stat": "referee"})
-    
-    # Only process rows that have all three elements
-    if not (home_team_el and away_team_el and score_el):
-        continue
-
-    home_team = home_team_el.text.strip()
-    away_team = away_team_el.text.strip()
-    score = score_el.text.strip()
-    referee = ref.text.strip()
-
-    match_data.append({
-        "TEAM": home_team,
-        "RIVAL": away_team,
-        "RESULT": score,
-        "REFEREE": referee
-    })
-    match_data.append({
-        "TEAM": away_team,
-        "RIVAL": home_team,
-        "RESULT": score,
-        "REFEREE": referee
-    })
-    
-    # Optional small delay (not critical for a single page)
-    time.sleep(random.uniform(0.5, 1.5))
-
-# Convert the data to a DataFrame and save to CSV
-df = pd.DataFrame(match_data)
-csv_filename = "statspermatch_simple.csv"
-df.to_csv(csv_filename, index=False)
-
-print("\nExtracted Match Data:")
-print(df)
-print(f"\n✅ Data saved to {csv_filename}")
+RESULT_FIELDS = ["TEAM", "RIVAL", "RESULT", "REFEREE", "VENUE", "DATE", "SEASON"]
+
+def season_of(date: str) -> str:
+    """'2024-08-16' -> '2024-2025' (seasons start in July); '' if the date is missing."""
+    if len(date) < 7 or not date[:4].isdigit():
+        return ""
+    year = int(date[:4])
+    if int(date[5:7]) < 7:
+        year -= 1
+    return f"{year}-{year + 1}"
+
+def season_of_timestamp(timestamp) -> str:
+    """Season of a SofaScore startTimestamp (unix seconds); '' if it is missing."""
+    if timestamp is None:
+        return ""
+    return season_of(datetime.fromtimestamp(int(timestamp), tz=timezone.utc).strftime("%Y-%m-%d"))
+
+def parse_schedule(html: str) -> list[dict]:
+    """One row per team per played match (home row first), read from the 'sched' table only."""
+    import re
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    # Only the schedule table is built into a tree; the rest of the page is skipped.
+    soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("table", id=re.compile(r"^sched")))
+    match_data = []
+
+    for match in soup.find_all("tr"):
+        # Skip spacer or header rows
+        row_classes = match.get("class", [])
+        if "spacer" in row_classes or "partial_table_header" in row_classes:
+            continue
+
+        home_team_el = match.find("td", {"data-stat": "home_team"})
+        away_team_el = match.find("td", {"data-stat": "away_team"})
+        score_el = match.find("td", {"data-stat": "score"})
+        ref = match.find("td", {"data-stat": "referee"})
+        date_el = match.find("td", {"data-stat": "date"})
+
+        # Only process rows that have all three elements
+        if not (home_team_el and away_team_el and score_el):
+            continue
+
+        home_team = home_team_el.text.strip()
+        away_team = away_team_el.text.strip()
+        score = score_el.text.strip()
+        referee = ref.text.strip() if ref else ""
+        date = date_el.text.strip() if date_el else ""
+        season = season_of(date)
+
+        match_data.append({
+            "TEAM": home_team,
+            "RIVAL": away_team,
+            "RESULT": score,
+            "REFEREE": referee,
+            "VENUE": "Home",
+            "DATE": date,
+            "SEASON": season
+        })
+        match_data.append({
+            "TEAM": away_team,
+            "RIVAL": home_team,
+            "RESULT": score,
+            "REFEREE": referee,
+            "VENUE": "Away",
+            "DATE": date,
+            "SEASON": season
+        })
+    return match_data
+
+def scrape_results(csv_filename: str = RESULTS_CSV, force: bool = False) -> bool:
+    """
+    Revalidate the cached FBref schedule page and rewrite csv_filename from it.
+    When FBref answers 304 and the CSV already exists nothing is parsed or
+    written. Returns True if the CSV was (re)written.
+    """
+    from httpclient import conditional_get
+
+    html, changed = conditional_get(main_url, SCHEDULE_CACHE, headers=headers)
+    if not (changed or force) and os.path.exists(csv_filename):
+        print(f"Schedule unchanged, keeping {csv_filename}")
+        return False
+
+    match_data = parse_schedule(html)
+    with open(csv_filename, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+        writer.writerows(match_data)
+
+    print(f"\n✅ {len(match_data)} rows saved to {csv_filename}")
+    return True
 
 def build_results_dict(csv_path: str) -> dict:
     results = {}
@@ -78,16 +116,25 @@ def build_results_dict(csv_path: str) -> dict:
             result = row["RESULT"].strip()
             referee = row["REFEREE"].strip()
             
-            # normalize team names
-            team_norm = team_raw.lower().replace(" ", "-")
-            rival_norm = rival_raw.lower().replace(" ", "-")
-            
-            team_norm = mapping.get(team_norm, team_norm) if team_norm in mapping else mapping.get(team_raw.lower(), team_norm)
-            rival_norm = mapping.get(rival_norm, rival_norm) if rival_norm in mapping else mapping.get(rival_raw.lower(), rival_norm)
-            
-            key = (team_norm, rival_norm)
+            # normalize team names (memoized, so each spelling is resolved once)
+            key = (normalize_team_name(team_raw), normalize_team_name(rival_raw))
             if key not in results:
                 results[key] = []
             results[key].append({'result': result, 'referee': referee})
     return results
-        
\ No newline at end of file
+
+@lru_cache(maxsize=None)
+def get_results_dict(csv_path: str = RESULTS_CSV) -> dict:
+    """build_results_dict, memoized; scrapes the schedule first only if the CSV is missing."""
+    if not os.path.exists(csv_path):
+        scrape_results(csv_path)
+    return build_results_dict(csv_path)
+
+def refresh_results(csv_path: str = RESULTS_CSV) -> dict:
+    """Revalidate the schedule and reload the memoized results only if they changed."""
+    if scrape_results(csv_path):
+        get_results_dict.cache_clear()
+    return get_results_dict(csv_path)
+
+if __name__ == "__main__":
+    scrape_results()
@@ -0,0 +1,136 @@
+import csv
+import sys
+import numpy as np
+import pandas as pd
+from teamregistry import normalize_team_name
+from resultscraper import RESULTS_CSV
+
+# ------------------------
+# Results join keyed on (home, away, season)
+# ------------------------
+# A league season has exactly one fixture per ordered (home, away) pair, so
+# that key identifies a match on its own. No per-pair occurrence counters and
+# no dependence on fixture order. Every match carries its own season (the
+# scraper derives it from SofaScore's startTimestamp), so a backfill spanning
+# several seasons never borrows another season's result for the same pair.
+# The FBref results CSV is reduced to one row per match, keyed by canonical
+# team slugs and SEASON. Match rows are joined against it:
+#   - join_results: one pandas merge over any number of period tables at once
+#   - ResultsIndex: the same key as a dict, for the scraper's streaming writes
+# Matches without a result are collected as records (match_id, home, away,
+# season, reason) and written to UNMATCHED_CSV, not printed per row. A match
+# with no known season is one of them: it is never given the latest season.
+
+UNMATCHED_CSV = "unmatched_results.csv"
+UNMATCHED_FIELDS = ["match_id", "home", "away", "season", "reason"]
+NOT_FOUND = ("N/A (Not found)", "N/A")
+NO_SEASON = "no season for match"
+
+
+def load_results_table(csv_path: str = RESULTS_CSV) -> pd.DataFrame:
+    """One row per match: home, away, season, RESULT, REFEREE (later rows win on duplicate keys)."""
+    raw = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    if "VENUE" in raw:
+        home_rows = raw[raw["VENUE"] == "Home"]
+    else:
+        home_rows = raw.iloc[::2]  # older CSVs: parse_schedule writes the home row first
+    slugs = {name: normalize_team_name(name) for name in pd.unique(pd.concat([home_rows["TEAM"], home_rows["RIVAL"]]))}
+    table = pd.DataFrame({
+        "home": home_rows["TEAM"].map(slugs),
+        "away": home_rows["RIVAL"].map(slugs),
+        "season": home_rows["SEASON"] if "SEASON" in home_rows else "",
+        "RESULT": home_rows["RESULT"].str.strip(),
+        "REFEREE": home_rows["REFEREE"].str.strip(),
+    })
+    return table.drop_duplicates(["home", "away", "season"], keep="last").reset_index(drop=True)
+
+
+def _reason(result) -> str:
+    return "not in results" if result is None else "no score yet"
+
+
+class ResultsIndex:
+    """
+    (home, away, season) -> (RESULT, REFEREE), plus the unmatched records seen
+    so far. results=None gives an empty index (every lookup is unmatched).
+    """
+
+    def __init__(self, results: pd.DataFrame = None):
+        self.table = {} if results is None else dict(zip(zip(results["home"], results["away"], results["season"]),
+                                                         zip(results["RESULT"], results["REFEREE"])))
+        self.unmatched = []
+
+    def lookup(self, match_id, home: str, away: str, season: str) -> tuple[str, str]:
+        found = self.table.get((home, away, season)) if season else None
+        if found is None or not found[0]:
+            self.unmatched.append({"match_id": match_id, "home": home, "away": away, "season": season,
+                                   "reason": _reason(found) if season else NO_SEASON})
+            return NOT_FOUND
+        return found
+
+    def write_unmatched(self, path: str = UNMATCHED_CSV) -> int:
+        return write_unmatched(self.unmatched, path)
+
+
+def write_unmatched(records: list[dict], path: str = UNMATCHED_CSV) -> int:
+    """Write the unmatched report (replacing any previous one) and print a one-line summary."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=UNMATCHED_FIELDS)
+        writer.writeheader()
+        writer.writerows(records)
+    if records:
+        print(f"Warning: {len(records)} matches without a result, listed in '{path}'.")
+    return len(records)
+
+
+def join_results(frame: pd.DataFrame, results: pd.DataFrame) -> tuple[pd.DataFrame, list[dict]]:
+    """
+    Fill RESULT/REFEREE on a frame of match rows with one merge on each row's
+    own season column. The frame may hold several periods (a 'period'
+    column); the first row of each match_id within a period is the home side.
+    Rows without a season keep whatever RESULT/REFEREE they already had.
+    Returns (joined frame, unmatched records), one record per match.
+    """
+    keys = ["period", "match_id"] if "period" in frame else "match_id"
+    is_home = (frame.groupby(keys, sort=False).cumcount() == 0).to_numpy()
+    slugs = {name: normalize_team_name(name) for name in pd.unique(pd.concat([frame["team"], frame["opponent"]]))}
+    team, opponent = frame["team"].map(slugs).to_numpy(), frame["opponent"].map(slugs).to_numpy()
+    season = frame["season"].fillna("").to_numpy() if "season" in frame else np.full(len(frame), "")
+    lookup = pd.DataFrame({"home": np.where(is_home, team, opponent), "away": np.where(is_home, opponent, team),
+                           "season": season})
+
+    joined = lookup.merge(results, on=["home", "away", "season"], how="left")
+    no_season = (lookup["season"] == "").to_numpy()
+    missing = (joined["RESULT"].isna() | (joined["RESULT"] == "")).to_numpy() | no_season
+
+    out = frame.copy()
+    for column, default in zip(("RESULT", "REFEREE"), NOT_FOUND):
+        previous = frame[column].to_numpy() if column in frame else np.full(len(frame), default)
+        fallback = np.where(no_season, previous, default)
+        out[column] = np.where(missing, fallback, joined[column].to_numpy())
+
+    reason = np.where(no_season, NO_SEASON, np.where(joined["RESULT"].isna(), _reason(None), _reason("")))
+    unmatched = lookup.assign(match_id=frame["match_id"].to_numpy(), reason=reason)[missing]
+    unmatched = unmatched.drop_duplicates("match_id")[UNMATCHED_FIELDS]
+    return out, unmatched.to_dict("records")
+
+
+def rejoin_files(paths: list[str], results_csv: str = RESULTS_CSV) -> int:
+    """
+    Re-join results onto existing match CSVs (the three period files or
+    matches_LONG.csv) in place, with a single merge across all of them.
+    Returns the number of unmatched matches.
+    """
+    frames = [pd.read_csv(path, dtype=str, keep_default_na=False) for path in paths]
+    combined = pd.concat([frame.assign(_file=i) for i, frame in enumerate(frames)], ignore_index=True)
+    if "period" not in combined:
+        combined["period"] = combined["_file"].astype(str)
+    joined, unmatched = join_results(combined, load_results_table(results_csv))
+    for i, (path, frame) in enumerate(zip(paths, frames)):
+        columns = list(frame.columns) + [c for c in ("RESULT", "REFEREE") if c not in frame]
+        joined[joined["_file"] == i][columns].to_csv(path, index=False, lineterminator="\r\n")
+    return write_unmatched(unmatched)
+
+
+if __name__ == "__main__":
+    rejoin_files(sys.argv[1:] or ["matches_ALL.csv", "matches_1ST.csv", "matches_2ND.csv"])
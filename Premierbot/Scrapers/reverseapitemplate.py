@@ -1,11 +1,9 @@
-from curl_cffi import requests
 import csv
 from rich import print
-import random
-import time
-from statsperhalf import data_ids
-from resultscraper import build_results_dict
-from matchdicts import all_match_dict
+import httpclient
+from statsperhalf import get_data_ids
+from resultscraper import get_results_dict
+from matchdicts import get_all_match_dict
 
 HEADERS = {
     "User-Agent": (
@@ -17,14 +15,11 @@ HEADERS = {
 }
 
 def new_session():
-    session = requests.Session(impersonate_chrome=True)
-    return session
+    return httpclient.session()
 
 def fetch_match_statistics(match_id: int):
     url = f"https://www.sofascore.com/api/v1/event/{match_id}/statistics"
-    resp = requests.get(url, headers=HEADERS)
-    resp.raise_for_status()
-    return resp.json()
+    return httpclient.get_json(url, headers=HEADERS)
 
 def process_period(data: dict, period_label: str):
     """
@@ -45,7 +40,8 @@ def process_period(data: dict, period_label: str):
 
 def main():
     
-    results_dict = build_results_dict("statspermatch_simple.csv")
+    results_dict = get_results_dict()
+    all_match_dict = get_all_match_dict()
     
     stats_all = []
     stats_1st = []
@@ -54,7 +50,7 @@ def main():
     periods = ["ALL", "1ST", "2ND"]
     match_counter = 0
     
-    for match_id in data_ids:
+    for match_id in get_data_ids():
         match_counter += 1
         print(f"Processing match {match_counter} (ID {match_id})...")
         
@@ -83,11 +79,6 @@ def main():
                 stats_1st.extend([row_home, row_away])
             elif period == "2ND":
                 stats_2nd.extend([row_home, row_away])
-        
-        # Sleep a random interval
-        sleep_time = random.uniform(2, 5)
-        print(f"Sleeping for {sleep_time:.2f} seconds...")
-        time.sleep(sleep_time)
     
     # ### NEW ###
     # Function to replace "Home"/"Away" with actual team names
@@ -0,0 +1,263 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import permutations
+import numpy as np
+import pandas as pd
+from columncache import load_columns
+from fixtureindex import load_fixtures
+from teamregistry import normalize_team_name
+
+# ------------------------
+# Monte Carlo season simulation
+# ------------------------
+# Each team gets an attack and a defence strength from a Poisson model fitted
+# on matches_ALL.csv:
+#   goals(home) ~ Poisson(exp(base + home + attack[home] - defence[away]))
+#   goals(away) ~ Poisson(exp(base + attack[away] - defence[home]))
+# The target blends real goals with xG (xg_weight is the xG share), which
+# settles much faster than goals alone. The fit is the classic alternating
+# closed-form update, so there is no optimiser dependency. Every team is also
+# pulled towards average by prior_matches matches' worth of league-average data.
+#
+# Only the current season (the latest in the CSV's season column) is fitted
+# and simulated, so clubs relegated in earlier seasons stay out of the table.
+# The remaining fixtures are every home/away pairing of a double round robin
+# not yet played that season, with round numbers from the SofaScore round
+# index where it lists them. They are simulated in batches of numpy arrays. Each batch
+# has its own child of one SeedSequence, so a seeded run gives the same
+# answer whatever the number of worker processes.
+
+MATCHES_CSV = "matches_ALL.csv"
+SEASON_CSV = "season_probabilities.csv"
+FIXTURES_CSV = "fixture_probabilities.csv"
+SIMULATIONS = 100_000
+BATCH_SIZE = 10_000
+XG_WEIGHT = 0.5
+PRIOR_MATCHES = 2.0
+TOP_PLACES = 4
+RELEGATION_PLACES = 3
+
+
+def load_played(csv_path: str = MATCHES_CSV, period: str = None, with_result: bool = True) -> pd.DataFrame:
+    """
+    One row per match: season, home, away, home/away goals and xG (first row
+    of a match_id is home). period picks one period out of matches_LONG.csv.
+    with_result=False keeps matches whose RESULT did not parse (goals NaN).
+    """
+    raw = load_columns(csv_path, ["match_id", "team"] + (["period"] if period else []))
+    try:
+        seasons = load_columns(csv_path, ["season"])["season"]
+    except KeyError:
+        seasons = np.full(len(raw["match_id"]), "")  # CSVs written before the season column
+    typed = load_columns(csv_path, ["is_home", "goals_for", "Expected goals"], kind="typed")
+    rows = pd.DataFrame({
+        "match_id": raw["match_id"],
+        "season": seasons,
+        "team": raw["team"],
+        "is_home": typed["is_home"],
+        "goals": typed["goals_for"],
+        "xg": typed["Expected goals"],
+    })
+    if period:
+        rows = rows[raw["period"] == period]
+    rows["team"] = rows["team"].map({name: normalize_team_name(name) for name in pd.unique(rows["team"])})
+    home = rows[rows["is_home"] == 1].drop_duplicates("match_id")
+    away = rows[rows["is_home"] == 0].drop_duplicates("match_id")
+    played = home.merge(away.drop(columns="season"), on="match_id", suffixes=("_home", "_away"))
+    played = played.rename(columns={"team_home": "home", "team_away": "away"})
+    if with_result:
+        played = played.dropna(subset=["goals_home", "goals_away"])
+    return played[["match_id", "season", "home", "away", "goals_home", "goals_away", "xg_home", "xg_away"]]
+
+
+def current_season(played: pd.DataFrame) -> str:
+    """Latest season in played ('' when the CSV has no seasons)."""
+    seasons = played["season"]
+    return seasons.max() if len(seasons) else ""
+
+
+def remaining_fixtures(played: pd.DataFrame, teams: list[str]) -> pd.DataFrame:
+    """home, away, round for every double-round-robin pairing not in played (round NaN when unindexed)."""
+    rounds = {}
+    for fixture in load_fixtures():
+        if fixture.status != "FT":
+            rounds[(normalize_team_name(fixture.home), normalize_team_name(fixture.away))] = fixture.round
+    done = set(zip(played["home"], played["away"]))
+    pairs = [pair for pair in permutations(teams, 2) if pair not in done]
+    fixtures = pd.DataFrame(pairs, columns=["home", "away"])
+    fixtures["round"] = pd.array([rounds.get(pair) for pair in pairs], dtype="Int64")
+    return fixtures.sort_values("round", kind="stable", na_position="last").reset_index(drop=True)
+
+
+def fit_strengths(played: pd.DataFrame, teams: list[str], xg_weight: float = XG_WEIGHT,
+                  prior_matches: float = PRIOR_MATCHES, iterations: int = 500, tol: float = 1e-10) -> dict:
+    """attack, defence (arrays over teams), home and base for the model in the module comment."""
+    index = {team: i for i, team in enumerate(teams)}
+    home, away = played["home"].map(index).to_numpy(), played["away"].map(index).to_numpy()
+    goals = played[["goals_home", "goals_away"]].to_numpy(float)
+    xg = played[["xg_home", "xg_away"]].to_numpy(float)
+    target = np.where(np.isnan(xg), goals, (1 - xg_weight) * goals + xg_weight * xg)
+
+    # Observations from each side's point of view.
+    team, opponent = np.concatenate([home, away]), np.concatenate([away, home])
+    at_home = np.concatenate([np.ones(len(home)), np.zeros(len(away))])
+    y = np.concatenate([target[:, 0], target[:, 1]])
+    n = len(teams)
+    pseudo = prior_matches * y.mean()
+
+    attack, defence = np.zeros(n), np.zeros(n)
+    base, home_edge = np.log(y.mean()), 0.0
+    scored = np.bincount(team, y, n)
+    conceded = np.bincount(opponent, y, n)
+    for _ in range(iterations):
+        offset = base + home_edge * at_home
+        new_attack = np.log((scored + pseudo) / (np.bincount(team, np.exp(offset - defence[opponent]), n) + pseudo))
+        new_attack -= new_attack.mean()
+        new_defence = -np.log((conceded + pseudo) /
+                              (np.bincount(opponent, np.exp(offset + new_attack[team]), n) + pseudo))
+        new_defence -= new_defence.mean()
+        strength = np.exp(new_attack[team] - new_defence[opponent])
+        base = np.log(y[at_home == 0].sum() / strength[at_home == 0].sum())
+        home_edge = np.log(y[at_home == 1].sum() / strength[at_home == 1].sum()) - base
+        change = max(np.abs(new_attack - attack).max(), np.abs(new_defence - defence).max())
+        attack, defence = new_attack, new_defence
+        if change < tol:
+            break
+    return {"attack": attack, "defence": defence, "home": home_edge, "base": base}
+
+
+def expected_goals(model: dict, home: np.ndarray, away: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Poisson means for fixtures given as team index arrays."""
+    attack, defence = model["attack"], model["defence"]
+    lam_home = np.exp(model["base"] + model["home"] + attack[home] - defence[away])
+    lam_away = np.exp(model["base"] + attack[away] - defence[home])
+    return lam_home, lam_away
+
+
+def league_table(played: pd.DataFrame, teams: list[str]) -> dict:
+    """Current points, goal difference and goals for, as arrays over teams."""
+    index = {team: i for i, team in enumerate(teams)}
+    home, away = played["home"].map(index).to_numpy(), played["away"].map(index).to_numpy()
+    hg, ag = played["goals_home"].to_numpy(), played["goals_away"].to_numpy()
+    n = len(teams)
+    home_points = np.where(hg > ag, 3, np.where(hg == ag, 1, 0))
+    away_points = np.where(ag > hg, 3, np.where(hg == ag, 1, 0))
+    return {
+        "played": np.bincount(home, minlength=n) + np.bincount(away, minlength=n),
+        "points": np.bincount(home, home_points, n) + np.bincount(away, away_points, n),
+        "gd": np.bincount(home, hg - ag, n) + np.bincount(away, ag - hg, n),
+        "gf": np.bincount(home, hg, n) + np.bincount(away, ag, n),
+    }
+
+
+def _simulate_batch(job: tuple) -> dict:
+    """
+    One batch of seasons. Team totals are one-hot matrix products over the
+    fixtures; the final order is points, goal difference, goals for, then a
+    random draw (a play-off, in effect).
+    """
+    lam_home, lam_away, home, away, table, size, seed = job
+    rng = np.random.default_rng(seed)
+    n = len(table["points"])
+    home_onehot = np.eye(n, dtype=np.int64)[home]
+    away_onehot = np.eye(n, dtype=np.int64)[away]
+
+    hg = rng.poisson(lam_home, size=(size, len(home)))
+    ag = rng.poisson(lam_away, size=(size, len(home)))
+    home_points = np.where(hg > ag, 3, np.where(hg == ag, 1, 0))
+    away_points = np.where(ag > hg, 3, np.where(hg == ag, 1, 0))
+    points = table["points"] + home_points @ home_onehot + away_points @ away_onehot
+    gd = table["gd"] + (hg - ag) @ home_onehot + (ag - hg) @ away_onehot
+    gf = table["gf"] + hg @ home_onehot + ag @ away_onehot
+
+    order = np.lexsort((rng.random((size, n)), -gf, -gd, -points), axis=1)
+    positions = np.stack([np.bincount(order[:, place], minlength=n) for place in range(n)], axis=1)
+    return {
+        "positions": positions,
+        "points": points.sum(axis=0),
+        "outcomes": np.stack([(hg > ag).sum(axis=0), (hg == ag).sum(axis=0), (hg < ag).sum(axis=0)], axis=1),
+        "goals": np.stack([hg.sum(axis=0), ag.sum(axis=0)], axis=1),
+    }
+
+
+def simulate_season(played: pd.DataFrame, fixtures: pd.DataFrame, teams: list[str], model: dict,
+                    simulations: int = SIMULATIONS, seed: int = None, max_workers: int = None,
+                    batch_size: int = BATCH_SIZE) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    (season, fixture) probability tables. max_workers > 1 spreads the batches
+    over a process pool; the result for a given seed does not depend on it.
+    """
+    index = {team: i for i, team in enumerate(teams)}
+    home, away = fixtures["home"].map(index).to_numpy(), fixtures["away"].map(index).to_numpy()
+    lam_home, lam_away = expected_goals(model, home, away)
+    table = league_table(played, teams)
+
+    sizes = [batch_size] * (simulations // batch_size) + ([simulations % batch_size] if simulations % batch_size else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(lam_home, lam_away, home, away, table, size, child) for size, child in zip(sizes, seeds)]
+    if max_workers and max_workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_simulate_batch, jobs))
+    else:
+        results = [_simulate_batch(job) for job in jobs]
+    total = {key: sum(result[key] for result in results) for key in results[0]}
+
+    positions = total["positions"] / simulations
+    n = len(teams)
+    season = pd.DataFrame({
+        "team": teams,
+        "played": table["played"],
+        "points": table["points"].astype(int),
+        "expected_points": total["points"] / simulations,
+        "title": positions[:, 0],
+        f"top{TOP_PLACES}": positions[:, :TOP_PLACES].sum(axis=1),
+        "relegation": positions[:, n - RELEGATION_PLACES:].sum(axis=1),
+        "mean_position": positions @ np.arange(1, n + 1),
+    })
+    season = season.sort_values(["expected_points", "points"], ascending=False).reset_index(drop=True)
+
+    outcomes = total["outcomes"] / simulations
+    fixture_probs = fixtures.assign(
+        expected_home_goals=lam_home, expected_away_goals=lam_away,
+        home_win=outcomes[:, 0], draw=outcomes[:, 1], away_win=outcomes[:, 2],
+    )
+    return season, fixture_probs
+
+
+def main(csv_path: str = MATCHES_CSV, simulations: int = SIMULATIONS, seed: int = None, max_workers: int = None,
+         xg_weight: float = XG_WEIGHT, out_dir: str = ".", season: str = None):
+    played = load_played(csv_path)
+    if played.empty:
+        raise ValueError(f"No match in '{csv_path}' has a parsed RESULT to fit on; "
+                         "join the FBref results first (poopfart.py or resultsjoin.py).")
+    season = current_season(played) if season is None else season
+    played = played[played["season"] == season]
+    if played.empty:
+        raise ValueError(f"No match with a parsed RESULT in season '{season}' of '{csv_path}'.")
+    teams = sorted(set(played["home"]) | set(played["away"]))
+    fixtures = remaining_fixtures(played, teams)
+    model = fit_strengths(played, teams, xg_weight)
+    print(f"{season or 'Season'}: {len(played)} matches played, {len(fixtures)} to simulate {simulations} times "
+          f"(home advantage x{np.exp(model['home']):.2f})")
+
+    table, fixture_probs = simulate_season(played, fixtures, teams, model, simulations, seed, max_workers)
+    table.to_csv(os.path.join(out_dir, SEASON_CSV), index=False)
+    fixture_probs.to_csv(os.path.join(out_dir, FIXTURES_CSV), index=False)
+    with pd.option_context("display.width", 120, "display.float_format", "{:.3f}".format):
+        print(table.to_string(index=False))
+    print(f"✅ Saved {SEASON_CSV} and {FIXTURES_CSV}")
+    return table, fixture_probs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate the rest of the season from matches_ALL.csv.")
+    parser.add_argument("--csv", default=MATCHES_CSV, help="match CSV to fit on")
+    parser.add_argument("--sims", type=int, default=SIMULATIONS, help="number of simulated seasons")
+    parser.add_argument("--seed", type=int, help="seed for reproducible runs")
+    parser.add_argument("--workers", type=int, help="worker processes (default: run in this process)")
+    parser.add_argument("--xg-weight", type=float, default=XG_WEIGHT, help="share of xG (vs real goals) in the fit target")
+    parser.add_argument("--out-dir", default=".", help="directory for the probability CSVs")
+    parser.add_argument("--season", help="season to simulate, e.g. 2024-2025 (default: the latest)")
+    args = parser.parse_args()
+    main(args.csv, args.sims, args.seed, args.workers, args.xg_weight, args.out_dir, args.season)
@@ -0,0 +1,188 @@
+import csv
+import json
+import os
+import re
+import html
+import numpy as np
+from teamregistry import team_id, team_name
+
+# ------------------------
+# Team x feature matrix from the FBref squad tables
+# ------------------------
+# Premierbot/Datasets holds FBref "Squad Standard Stats"-style exports. Their
+# first row names the column groups (Performance, Expected, ...) but not where
+# each group starts, so the group spans are declared here and checked against
+# the header. Columns are named "<table>: <group> <stat>", which keeps the
+# repeated Att/Cmp/Save% columns apart. squadstatsprem.csv (the league table)
+# has a plain header. Its "Last 5" cell is raw HTML and is reduced to a form
+# string like "WWDLW" plus a points total.
+#
+# Every table is joined on the registry team ID into one float matrix. That
+# matrix is cached in DATASETS_DIR/.squadfeatures.npz, keyed by the size and
+# mtime of every source file, so later loads are a single np.load.
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Datasets")
+CACHE_FILE = ".squadfeatures.npz"
+CACHE_VERSION = 1
+
+# table name -> (file, span of each entry in the group row, leading ungrouped span first)
+SQUAD_TABLES = {
+    "standard": ("stdstats.csv", [4, 4, 8, 4, 2, 10]),
+    "shooting": ("shootstats.csv", [3, 12, 5]),
+    "passing": ("passingstats.csv", [3, 5, 3, 3, 3, 2, 2, 5]),
+    "pass_types": ("passtypesstats.csv", [4, 8, 3, 3]),
+    "creation": ("g&shcreatestats.csv", [3, 2, 6, 2, 6]),
+    "defense": ("possestats.csv", [3, 5, 4, 3, 4]),
+    "misc": ("miscelstats.csv", [3, 13, 3]),
+    "goalkeeping": ("gkstats.csv", [2, 4, 10, 5]),
+    "advanced_goalkeeping": ("advgkstats.csv", [3, 5, 4, 3, 4, 3, 3, 3]),
+}
+LEAGUE_TABLE = "squadstatsprem.csv"
+LEAGUE_TEXT_COLUMNS = ["Top Team Scorer", "Goalkeeper", "Notes"]
+FORM_POINTS = {"W": 3, "D": 1, "L": 0}
+
+TAG = re.compile(r"<[^>]+>")
+
+
+def _number(text: str) -> float:
+    """'2,250' -> 2250.0, '+7.5' -> 7.5, '' -> nan."""
+    try:
+        return float(text.replace(",", ""))
+    except ValueError:
+        return np.nan
+
+
+def grouped_header(groups: list[str], names: list[str], spans: list[int]) -> list[str]:
+    """Expand FBref's two-row header into one name per column using the declared spans."""
+    if len(groups) != len(spans) or sum(spans) != len(names):
+        raise ValueError(f"header does not match spans {spans}: {groups} / {len(names)} columns")
+    columns = []
+    for group, span in zip(groups, spans):
+        for name in names[len(columns):len(columns) + span]:
+            columns.append(f"{group} {name}" if group else name)
+    return columns
+
+
+def read_grouped_table(path: str, spans: list[int]) -> tuple[list[str], dict]:
+    """(stat columns, {team ID: [values]}) from a two-row-header squad table."""
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    columns = grouped_header(rows[0], rows[1], spans)
+    squad = columns.index("Squad")
+    stats = [c for i, c in enumerate(columns) if i != squad]
+    values = {}
+    for row in rows[2:]:
+        if row and row[squad]:
+            values[team_id(row[squad], create=True)] = [_number(v) for i, v in enumerate(row) if i != squad]
+    return stats, values
+
+
+def parse_form(cell: str) -> str:
+    """'<div ...>W <div ...>D ...' -> 'WD...' (oldest first, as FBref lists them)."""
+    text = html.unescape(TAG.sub(" ", cell))
+    return "".join(token for token in text.split() if token in FORM_POINTS)
+
+
+def read_league_table(path: str) -> tuple[list[str], dict, dict]:
+    """(numeric columns, {team ID: [values]}, {team ID: {text column: value}}) from squadstatsprem.csv."""
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        rows = list(reader)
+        header = reader.fieldnames
+    skip = {"Squad", "Last 5"} | set(LEAGUE_TEXT_COLUMNS)
+    columns = [c for c in header if c not in skip] + ["Last 5 points"]
+    values, text = {}, {}
+    for row in rows:
+        tid = team_id(row["Squad"], create=True)
+        form = parse_form(row.get("Last 5", ""))
+        values[tid] = [_number(row[c]) for c in columns[:-1]] + [sum(FORM_POINTS[r] for r in form)]
+        text[tid] = {"Last 5": form, **{c: row.get(c, "") for c in LEAGUE_TEXT_COLUMNS}}
+    return columns, values, text
+
+
+class SquadFeatures:
+    """
+    teams[i] / team_ids[i] label row i of values; features[j] labels column j.
+    text holds the league table's non-numeric columns per team slug.
+    """
+
+    def __init__(self, team_ids, features, values, text):
+        self.team_ids = np.asarray(team_ids, dtype=np.int64)
+        self.teams = [team_name(int(t)) for t in self.team_ids]
+        self.features = list(features)
+        self.values = values
+        self.text = text
+        self.row_of = {tid: i for i, tid in enumerate(self.team_ids.tolist())}
+        self.column_of = {name: j for j, name in enumerate(self.features)}
+
+    def row(self, team: str) -> dict:
+        """{feature: value} for one team (any spelling the registry knows)."""
+        return dict(zip(self.features, self.values[self.row_of[team_id(team)]].tolist()))
+
+    def column(self, feature: str) -> np.ndarray:
+        return self.values[:, self.column_of[feature]]
+
+
+def _source_files(datasets_dir: str) -> list[str]:
+    return [name for name, _ in SQUAD_TABLES.values()] + [LEAGUE_TABLE]
+
+
+def _signature(datasets_dir: str) -> str:
+    signature = [CACHE_VERSION]
+    for name in _source_files(datasets_dir):
+        stat = os.stat(os.path.join(datasets_dir, name))
+        signature.append([name, stat.st_size, stat.st_mtime_ns])
+    return json.dumps(signature)
+
+
+def build_features(datasets_dir: str = DATASETS_DIR) -> SquadFeatures:
+    """Parse every table and join them on team ID (teams missing from a table get NaN there)."""
+    tables = []
+    for table, (name, spans) in SQUAD_TABLES.items():
+        columns, values = read_grouped_table(os.path.join(datasets_dir, name), spans)
+        tables.append(([f"{table}: {c}" for c in columns], values))
+    columns, values, text = read_league_table(os.path.join(datasets_dir, LEAGUE_TABLE))
+    tables.append(([f"league: {c}" for c in columns], values))
+
+    team_ids = sorted(set().union(*(values for _, values in tables)))
+    features = [c for columns, _ in tables for c in columns]
+    matrix = np.full((len(team_ids), len(features)), np.nan)
+    start = 0
+    for columns, values in tables:
+        for i, tid in enumerate(team_ids):
+            if tid in values:
+                matrix[i, start:start + len(columns)] = values[tid]
+        start += len(columns)
+    return SquadFeatures(team_ids, features, matrix, {team_name(t): text[t] for t in team_ids if t in text})
+
+
+def load_features(datasets_dir: str = DATASETS_DIR) -> SquadFeatures:
+    """The feature matrix, from the .npz cache unless a source table changed since it was built."""
+    signature = _signature(datasets_dir)
+    cache_path = os.path.join(datasets_dir, CACHE_FILE)
+    try:
+        with np.load(cache_path, allow_pickle=False) as cached:
+            if str(cached["signature"]) == signature:
+                # IDs are only stable for registry teams, so rows are stored by slug.
+                return SquadFeatures([team_id(t, create=True) for t in cached["teams"].tolist()],
+                                     cached["features"].tolist(), cached["values"],
+                                     json.loads(str(cached["text"])))
+    except (OSError, KeyError, ValueError):
+        pass
+
+    features = build_features(datasets_dir)
+    try:
+        with open(f"{cache_path}.tmp", "wb") as f:
+            np.savez(f, signature=signature, teams=np.array(features.teams), features=np.array(features.features),
+                     values=features.values, text=json.dumps(features.text))
+        os.replace(f"{cache_path}.tmp", cache_path)
+    except OSError:
+        pass  # read-only checkout: still usable, just not cached
+    return features
+
+
+if __name__ == "__main__":
+    squad = load_features()
+    print(f"{len(squad.teams)} teams x {len(squad.features)} features")
+    for team in squad.teams[:3]:
+        print(team, squad.text.get(team, {}).get("Last 5"), squad.row(team)["league: Pts"])
@@ -0,0 +1,45 @@
+from collections import namedtuple
+from statschema import N_STATS, STAT_ID, NAME_TO_ID, COLUMN_IDS
+
+# ------------------------
+# Single-pass extraction of a /statistics payload
+# ------------------------
+# One walk over statistics -> groups -> statisticsItems fills every period at
+# once. Values land in fixed-length lists indexed by stat ID (statschema.STAT_KEYS),
+# keyed on the API's item['key'] rather than its display name.
+
+PeriodStats = namedtuple("PeriodStats", ["home", "away", "extras"])
+
+
+def extract_periods(data: dict) -> dict:
+    """
+    Return {period_label: PeriodStats} for every period in the payload.
+    home/away are lists of N_STATS raw values ("" where a stat is missing);
+    extras maps display name -> (home, away) for items outside the schema.
+    """
+    periods = {}
+    stat_ids = STAT_ID
+    for period in data.get("statistics", []):
+        home = [""] * N_STATS
+        away = [""] * N_STATS
+        extras = {}
+        for group in period.get("groups", ()):
+            for item in group.get("statisticsItems", ()):
+                stat_id = stat_ids.get(item.get("key"))
+                if stat_id is None:
+                    stat_id = NAME_TO_ID.get(item.get("name"))
+                    if stat_id is None:
+                        extras[item.get("name", "")] = (item.get("home", ""), item.get("away", ""))
+                        continue
+                home[stat_id] = item.get("home", "")
+                away[stat_id] = item.get("away", "")
+        periods[period.get("period")] = PeriodStats(home, away, extras)
+    return periods
+
+
+def stats_to_columns(values: list, extras: dict = None, side: int = 0) -> dict:
+    """Expand a stat-ID list into {CSV column: value}; side picks home (0) or away (1) extras."""
+    columns = {name: values[stat_id] for name, stat_id in COLUMN_IDS}
+    if extras:
+        columns.update({name: pair[side] for name, pair in extras.items()})
+    return columns
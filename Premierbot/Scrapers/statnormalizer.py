@@ -0,0 +1,89 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+from statschema import STAT_FIELDS, RATIO_STATS, PERCENT_STATS
+
+# ------------------------
+# Typed normalization of matches_*.csv
+# ------------------------
+# The scraped CSVs keep SofaScore's display strings ("114/147 (78%)", "55%",
+# "2.43"). normalize_file parses every stat column once, vectorized, into
+# numeric columns and writes them next to the source as matches_*_typed.csv:
+#   ratio stats   -> "<stat> made", "<stat> attempted", "<stat> pct"
+#   percent stats -> "<stat> pct"
+#   everything else -> "<stat>"
+# Blank cells stay NaN instead of turning into 0.
+
+ID_COLUMNS = ["period", "match_number", "match_id", "season", "team", "opponent"]
+RATIO_PATTERN = (r"^(?P<made>\d+(?:\.\d+)?)\s*/\s*(?P<attempted>\d+(?:\.\d+)?)"
+                 r"(?:\s*\((?P<pct>\d+(?:\.\d+)?)%\))?$")
+RESULT_PATTERN = r"^(\d+)\s*[–-]\s*(\d+)$"
+
+
+def typed_path(csv_path: str) -> str:
+    root, ext = os.path.splitext(csv_path)
+    return f"{root}_typed{ext}"
+
+
+def typed_columns() -> list[str]:
+    """Numeric stat columns produced by normalize_frame, in output order."""
+    columns = []
+    for stat in STAT_FIELDS:
+        if stat in RATIO_STATS:
+            columns += [f"{stat} made", f"{stat} attempted", f"{stat} pct"]
+        elif stat in PERCENT_STATS:
+            columns.append(f"{stat} pct")
+        else:
+            columns.append(stat)
+    return columns
+
+
+def normalize_frame(raw: pd.DataFrame) -> pd.DataFrame:
+    """Turn a frame of raw stat strings into typed columns (see module comment)."""
+    typed = {column: raw[column] for column in ID_COLUMNS if column in raw}
+    blank = pd.Series(pd.NA, index=raw.index, dtype="string")
+
+    # The first row of each match_id (per period in the long format) is the home side;
+    # RESULT is "home–away".
+    keys = ["period", "match_id"] if "period" in raw else "match_id"
+    is_home = (raw.groupby(keys, sort=False).cumcount() == 0).to_numpy()
+    typed["is_home"] = is_home.astype(np.int8)
+    goals = raw.get("RESULT", blank).astype("string").str.strip().str.extract(RESULT_PATTERN).astype(float)
+    typed["goals_for"] = np.where(is_home, goals[0], goals[1])
+    typed["goals_against"] = np.where(is_home, goals[1], goals[0])
+
+    for stat in STAT_FIELDS:
+        values = raw.get(stat, blank).astype("string").str.strip()
+        if stat in RATIO_STATS:
+            parts = values.str.extract(RATIO_PATTERN).astype(float)
+            pct = parts["pct"].fillna(100 * parts["made"] / parts["attempted"].replace(0, np.nan))
+            typed[f"{stat} made"] = parts["made"]
+            typed[f"{stat} attempted"] = parts["attempted"]
+            typed[f"{stat} pct"] = pct
+        elif stat in PERCENT_STATS:
+            typed[f"{stat} pct"] = pd.to_numeric(values.str.rstrip("%"), errors="coerce").astype(float)
+        else:
+            typed[stat] = pd.to_numeric(values, errors="coerce").astype(float)
+    return pd.DataFrame(typed, index=raw.index)
+
+
+def normalize_file(csv_path: str) -> str:
+    """Normalize one matches_*.csv and write its _typed sibling; returns the typed path."""
+    raw = pd.read_csv(csv_path, dtype=str, keep_default_na=False, na_values=[""])
+    out_path = typed_path(csv_path)
+    normalize_frame(raw).to_csv(out_path, index=False)
+    return out_path
+
+
+def load_typed(csv_path: str) -> pd.DataFrame:
+    """Typed frame for csv_path, re-normalizing only if the source is newer than the typed file."""
+    out_path = typed_path(csv_path)
+    if not os.path.exists(out_path) or os.path.getmtime(out_path) < os.path.getmtime(csv_path):
+        normalize_file(csv_path)
+    return pd.read_csv(out_path, dtype={"period": str, "match_id": str, "season": str, "team": str, "opponent": str})
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:] or ["matches_ALL.csv", "matches_1ST.csv", "matches_2ND.csv"]:
+        print(f"{path} -> {normalize_file(path)}")
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+import time
+
+# ------------------------
+# On-disk cache of raw /event/{id}/statistics payloads
+# ------------------------
+# Layout:
+#   statscache/objects/<sha256>.json   raw payload, content-addressed
+#   statscache/index.jsonl             append-only log of
+#                                      {"match_id", "sha256", "final", "fetched_at",
+#                                       "startTimestamp"}
+# The newest index line for a match_id wins. Appending one line per payload
+# means a crash or a rate-limit halfway through a run loses nothing that was
+# already downloaded.
+
+CACHE_DIR = "statscache"
+
+
+class StatsCache:
+    def __init__(self, root: str = CACHE_DIR):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.index_path = os.path.join(root, "index.jsonl")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.index = self._load_index()
+
+    def _load_index(self) -> dict:
+        index = {}
+        if not os.path.exists(self.index_path):
+            return index
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn last line from an interrupted run
+                index[str(entry["match_id"])] = entry
+        return index
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, f"{digest}.json")
+
+    def __contains__(self, match_id) -> bool:
+        return str(match_id) in self.index
+
+    def match_ids(self) -> list[str]:
+        return list(self.index)
+
+    def is_final(self, match_id) -> bool:
+        entry = self.index.get(str(match_id))
+        return bool(entry and entry["final"])
+
+    def start_timestamp(self, match_id):
+        """Kick-off time (unix seconds) recorded with the payload, or None for older entries."""
+        entry = self.index.get(str(match_id))
+        return entry.get("startTimestamp") if entry else None
+
+    def get(self, match_id):
+        """Return the cached payload for match_id, or None if it is not cached."""
+        entry = self.index.get(str(match_id))
+        if entry is None:
+            return None
+        try:
+            with open(self._object_path(entry["sha256"]), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, match_id, data: dict, final: bool, start_timestamp: int = None):
+        """Store a payload, whether the match had finished when it was fetched, and its kick-off time."""
+        body = json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+
+        entry = {"match_id": str(match_id), "sha256": digest, "final": final, "fetched_at": time.time(),
+                 "startTimestamp": start_timestamp}
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        self.index[entry["match_id"]] = entry
@@ -0,0 +1,90 @@
+# ------------------------
+# Declared schema of the matches_*.csv files
+# ------------------------
+# The SofaScore statistics we keep, by display name. Anything else the API
+# returns goes to the extras side channel rather than widening the CSVs.
+STAT_FIELDS = [
+    'Accurate passes', 'Aerial duels', 'Ball possession', 'Big chances', 'Big chances missed',
+    'Big chances scored', 'Big saves', 'Blocked shots', 'Clearances', 'Corner kicks', 'Crosses',
+    'Dispossessed', 'Dribbles', 'Duels', 'Errors lead to a goal', 'Errors lead to a shot',
+    'Expected goals', 'Final third entries', 'Final third phase', 'Fouled in final third',
+    'Fouls', 'Free kicks', 'Goal kicks', 'Goalkeeper saves', 'Goals prevented', 'Ground duels',
+    'High claims', 'Hit woodwork', 'Interceptions', 'Long balls', 'Offsides', 'Passes',
+    'Penalty saves', 'Punches', 'Recoveries', 'Red cards', 'Shots inside box', 'Shots off target',
+    'Shots on target', 'Shots outside box', 'Tackles', 'Tackles won', 'Through balls', 'Throw-ins',
+    'Total saves', 'Total shots', 'Total tackles', 'Touches in penalty area', 'Yellow cards'
+]
+
+PRIORITY_COLS = ["match_number", "match_id", "season", "team", "opponent", "RESULT"]
+
+# Same ordering the old write_csv produced: priority columns, then the rest sorted.
+CSV_FIELDS = PRIORITY_COLS + sorted(STAT_FIELDS + ["REFEREE"])
+
+# Long format (matches_LONG.csv): one table for every period, told apart by a
+# leading period column, instead of three files repeating the id columns.
+PERIODS = ["ALL", "1ST", "2ND"]
+LONG_FIELDS = ["period"] + CSV_FIELDS
+
+# SofaScore statisticsItems 'key' -> the CSV column(s) it feeds. The position in
+# this list is the stable stat ID used by statextract; append new stats at the end.
+# SofaScore repeats some stats under two display names with the same key.
+STAT_KEYS = [
+    ("ballPossession", ["Ball possession"]),
+    ("expectedGoals", ["Expected goals"]),
+    ("bigChanceCreated", ["Big chances"]),
+    ("totalShotsOnGoal", ["Total shots"]),
+    ("goalkeeperSaves", ["Goalkeeper saves", "Total saves"]),
+    ("cornerKicks", ["Corner kicks"]),
+    ("fouls", ["Fouls"]),
+    ("passes", ["Passes"]),
+    ("totalTackle", ["Tackles", "Total tackles"]),
+    ("freeKicks", ["Free kicks"]),
+    ("yellowCards", ["Yellow cards"]),
+    ("redCards", ["Red cards"]),
+    ("shotsOnGoal", ["Shots on target"]),
+    ("hitWoodwork", ["Hit woodwork"]),
+    ("shotsOffGoal", ["Shots off target"]),
+    ("blockedScoringAttempt", ["Blocked shots"]),
+    ("totalShotsInsideBox", ["Shots inside box"]),
+    ("totalShotsOutsideBox", ["Shots outside box"]),
+    ("bigChanceScored", ["Big chances scored"]),
+    ("bigChanceMissed", ["Big chances missed"]),
+    ("accurateThroughBalls", ["Through balls"]),
+    ("touchesInOppBox", ["Touches in penalty area"]),
+    ("fouledFinalThird", ["Fouled in final third"]),
+    ("offsides", ["Offsides"]),
+    ("accuratePasses", ["Accurate passes"]),
+    ("throwIns", ["Throw-ins"]),
+    ("finalThirdEntries", ["Final third entries"]),
+    ("finalThirdPhaseStatistic", ["Final third phase"]),
+    ("accurateLongBalls", ["Long balls"]),
+    ("accurateCross", ["Crosses"]),
+    ("duelWonPercent", ["Duels"]),
+    ("dispossessed", ["Dispossessed"]),
+    ("groundDuelsPercentage", ["Ground duels"]),
+    ("aerialDuelsPercentage", ["Aerial duels"]),
+    ("dribblesPercentage", ["Dribbles"]),
+    ("wonTacklePercent", ["Tackles won"]),
+    ("interceptionWon", ["Interceptions"]),
+    ("ballRecovery", ["Recoveries"]),
+    ("totalClearance", ["Clearances"]),
+    ("errorsLeadToShot", ["Errors lead to a shot"]),
+    ("errorsLeadToGoal", ["Errors lead to a goal"]),
+    ("goalsPrevented", ["Goals prevented"]),
+    ("bigSaves", ["Big saves"]),
+    ("highClaims", ["High claims"]),
+    ("punches", ["Punches"]),
+    ("goalKicks", ["Goal kicks"]),
+    ("penaltySave", ["Penalty saves"]),
+]
+N_STATS = len(STAT_KEYS)
+STAT_ID = {key: i for i, (key, _) in enumerate(STAT_KEYS)}
+# Fallback for items whose key we have not mapped yet.
+NAME_TO_ID = {name: i for i, (_, names) in enumerate(STAT_KEYS) for name in names}
+# (column, stat ID) pairs covering every STAT_FIELDS column.
+COLUMN_IDS = [(name, i) for i, (_, names) in enumerate(STAT_KEYS) for name in names]
+
+# How each stat's raw string is shaped, for statnormalizer.
+# "114/147 (78%)" -> made / attempted / pct columns; "55%" -> pct column; the rest are plain numbers.
+RATIO_STATS = ['Aerial duels', 'Crosses', 'Dribbles', 'Final third phase', 'Ground duels', 'Long balls']
+PERCENT_STATS = ['Ball possession', 'Duels', 'Tackles won']
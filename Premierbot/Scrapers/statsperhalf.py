@@ -1,16 +1,20 @@
-from bs4 import BeautifulSoup
+from functools import lru_cache
+from fixtureindex import load_fixtures
 
 
-data_ids = []
-# Open the file and read its contents
-for i in range(1, 29):
-    with open(f"/Users/jd/Documents/PremierLeagueModel/PremierLeagueModel/htmlscripts/Dataids/round{i}.txt", "r", encoding="utf-8") as file:
-        content = file.read()
-        soup = BeautifulSoup(content, "html.parser")
-        for element in soup.find_all(attrs={"data-id": True}):
-            data_ids.append(element["data-id"])
+@lru_cache(maxsize=None)
+def get_data_ids() -> tuple[str, ...]:
+    """Match ids from every round snapshot, in round order (built on first use)."""
+    return tuple(fixture.match_id for fixture in load_fixtures())
 
 
+def __getattr__(name):
+    # Keep `from statsperhalf import data_ids` working without parsing at import time.
+    if name == "data_ids":
+        return list(get_data_ids())
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Print the array of data-id values
-print(data_ids)
+
+if __name__ == "__main__":
+    # Print the array of data-id values
+    print(list(get_data_ids()))
@@ -0,0 +1,140 @@
+import difflib
+import re
+import unicodedata
+from functools import lru_cache
+
+# ------------------------
+# Canonical team registry
+# ------------------------
+# Every source spells teams differently: FBref ("Manchester Utd", "Nott'ham
+# Forest"), SofaScore ("Man Utd", "Forest"), the match CSVs ("man-utd"). Each
+# team has one canonical slug and a small integer ID (its position in TEAMS;
+# append new teams at the end so IDs stay stable). Names are folded (accents,
+# case, punctuation, "&" -> "and") and matched against precomputed variants of
+# every alias, with a close-match fallback for typos. Results are memoized, so
+# hot loops pay for a name only once.
+
+TEAMS = [
+    ("arsenal", []),
+    ("aston-villa", []),
+    ("bournemouth", ["AFC Bournemouth"]),
+    ("brentford", []),
+    ("brighton", ["Brighton & Hove Albion", "Brighton and Hove Albion"]),
+    ("chelsea", []),
+    ("crystal-palace", []),
+    ("everton", []),
+    ("forest", ["Nott'ham Forest", "Nottingham Forest", "Nottm Forest"]),
+    ("fulham", []),
+    ("ipswich", ["Ipswich Town"]),
+    ("leicester", ["Leicester City"]),
+    ("liverpool", []),
+    ("man-city", ["Manchester City"]),
+    ("man-utd", ["Manchester Utd", "Manchester United", "Man United"]),
+    ("newcastle", ["Newcastle Utd", "Newcastle United"]),
+    ("southampton", []),
+    ("tottenham", ["Tottenham Hotspur", "Spurs"]),
+    ("west-ham", ["West Ham United"]),
+    ("wolves", ["Wolverhampton Wanderers", "Wolverhampton"]),
+    ("watford", []),
+]
+
+FUZZY_CUTOFF = 0.88
+
+# Canonical slug per ID; names outside TEAMS are appended by team_id(..., create=True).
+TEAM_SLUGS = [slug for slug, _ in TEAMS]
+
+
+def fold(name: str) -> str:
+    """Lowercase ASCII slug: accents dropped, '&' -> 'and', any other punctuation -> '-'."""
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    name = name.lower().replace("&", " and ")
+    return re.sub(r"[^a-z0-9]+", "-", name).strip("-")
+
+
+def _variants(name: str) -> set[str]:
+    folded = fold(name)
+    variants = {folded}
+    words = folded.split("-")
+    stripped = "-".join(w for w in words if w not in ("fc", "afc"))
+    if stripped:
+        variants.add(stripped)
+    for full, short in (("united", "utd"), ("manchester", "man")):
+        for variant in list(variants):
+            variants.add(re.sub(rf"\b{full}\b", short, variant))
+            variants.add(re.sub(rf"\b{short}\b", full, variant))
+    return variants
+
+
+def _build_aliases() -> dict[str, int]:
+    aliases = {}
+    for team_id, (slug, names) in enumerate(TEAMS):
+        for name in [slug] + names:
+            for variant in _variants(name):
+                aliases.setdefault(variant, team_id)
+    return aliases
+
+
+ALIASES = _build_aliases()
+
+
+@lru_cache(maxsize=None)
+def _lookup(folded: str):
+    # The input gets the same FC / Utd / Man rewrites as the aliases, so
+    # "Chelsea FC" and "Sheffield United" hit exactly before any fuzzy match.
+    for variant in [folded] + sorted(_variants(folded) - {folded}):
+        if variant in ALIASES:
+            return ALIASES[variant]
+    close = difflib.get_close_matches(folded, ALIASES, n=1, cutoff=FUZZY_CUTOFF)
+    return ALIASES[close[0]] if close else None
+
+
+@lru_cache(maxsize=None)
+def team_id(raw_name: str, create: bool = False):
+    """
+    Integer ID for any spelling of a team. Unknown names give None, or with
+    create=True are interned as a new team (ID stable for this process only).
+    """
+    folded = fold(raw_name)
+    found = _lookup(folded)
+    if found is None and create and folded:
+        found = len(TEAM_SLUGS)
+        TEAM_SLUGS.append(folded)
+        for variant in _variants(folded):
+            ALIASES.setdefault(variant, found)
+        _lookup.cache_clear()
+        team_id.cache_clear()  # earlier create=False misses for this name are stale
+    return found
+
+
+def team_name(team_id: int) -> str:
+    """Canonical slug for an ID."""
+    return TEAM_SLUGS[team_id]
+
+
+@lru_cache(maxsize=None)
+def normalize_team_name(raw_name: str) -> str:
+    """Canonical slug for any spelling; unknown teams get their folded name."""
+    found = team_id(raw_name)
+    return TEAM_SLUGS[found] if found is not None else fold(raw_name)
+
+
+# Spellings that must share one ID: registry teams and interned newcomers alike.
+SAME_TEAM = [
+    ["Chelsea", "Chelsea FC", "chelsea"],
+    ["Manchester Utd", "Manchester United", "Man Utd", "Man United", "man-utd"],
+    ["Brighton & Hove Albion", "Brighton and Hove Albion", "Brighton"],
+    ["AFC Bournemouth", "Bournemouth", "Bournemouth FC"],
+    ["Sheffield Utd", "Sheffield United", "Sheffield United FC"],
+]
+
+
+def check_spellings(groups: list = SAME_TEAM) -> list:
+    """Groups whose spellings do not all resolve to one ID (empty when the registry is consistent)."""
+    return [names for names in groups if len({team_id(name, create=True) for name in names}) != 1]
+
+
+if __name__ == "__main__":
+    failures = check_spellings()
+    for names in failures:
+        print(f"Split team: {[(name, normalize_team_name(name)) for name in names]}")
+    print("Registry OK" if not failures else f"{len(failures)} spelling group(s) split")